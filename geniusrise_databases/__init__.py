@@ -13,44 +13,109 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from geniusrise_databases.arangodb import ArangoDB
-from geniusrise_databases.athena import Athena
-from geniusrise_databases.azure_table import AzureTableStorage
-from geniusrise_databases.bigquery import BigQuery
-from geniusrise_databases.bigtable import Bigtable
-from geniusrise_databases.cassandra import Cassandra
-from geniusrise_databases.cloud_sql import GoogleCloudSQL
-from geniusrise_databases.cockroach import CockroachDB
-from geniusrise_databases.cosmosdb import CosmosDB
-from geniusrise_databases.couchbase import Couchbase
-from geniusrise_databases.db2 import DB2
-from geniusrise_databases.documentdb import DocumentDB
-from geniusrise_databases.dynamodb import DynamoDB
-from geniusrise_databases.elasticsearch import Elasticsearch
-from geniusrise_databases.firestore import Firestore
-from geniusrise_databases.graphite import Graphite
-from geniusrise_databases.hbase import HBase
-from geniusrise_databases.influxdb import InfluxDB
-from geniusrise_databases.kairosdb import KairosDB
-from geniusrise_databases.keyspaces import AWSKeyspaces
-from geniusrise_databases.ldap import LDAP
-from geniusrise_databases.memsql import MemSQL
-from geniusrise_databases.mongodb import MongoDB
-from geniusrise_databases.mysql import MySQL
-from geniusrise_databases.neo4j import Neo4j
-from geniusrise_databases.nuodb import NuoDB
-from geniusrise_databases.opentsdb import OpenTSDB
-from geniusrise_databases.oracle import Oracle
-from geniusrise_databases.postgres import PostgreSQL
-from geniusrise_databases.presto import Presto
-from geniusrise_databases.redis import Redis
-from geniusrise_databases.riak import Riak
-from geniusrise_databases.spanner import Spanner
-from geniusrise_databases.sql_server import SQLServer
-from geniusrise_databases.sqlite import SQLite
-from geniusrise_databases.sybase import Sybase
-from geniusrise_databases.teradata import Teradata
-from geniusrise_databases.tidb import TiDB
-from geniusrise_databases.timescaledb import TimescaleDB
-from geniusrise_databases.vertica import Vertica
-from geniusrise_databases.voltdb import VoltDB
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# Spouts are imported on first access so that only the driver of the spout in use gets loaded
+_LAZY = {
+    "ArangoDB": "arangodb",
+    "Athena": "athena",
+    "AzureTableStorage": "azure_table",
+    "BigQuery": "bigquery",
+    "Bigtable": "bigtable",
+    "Cassandra": "cassandra",
+    "GoogleCloudSQL": "cloud_sql",
+    "CockroachDB": "cockroach",
+    "CosmosDB": "cosmosdb",
+    "Couchbase": "couchbase",
+    "DB2": "db2",
+    "DocumentDB": "documentdb",
+    "DynamoDB": "dynamodb",
+    "Elasticsearch": "elasticsearch",
+    "Firestore": "firestore",
+    "Graphite": "graphite",
+    "HBase": "hbase",
+    "InfluxDB": "influxdb",
+    "KairosDB": "kairosdb",
+    "AWSKeyspaces": "keyspaces",
+    "LDAP": "ldap",
+    "MemSQL": "memsql",
+    "MongoDB": "mongodb",
+    "MySQL": "mysql",
+    "Neo4j": "neo4j",
+    "NuoDB": "nuodb",
+    "OpenTSDB": "opentsdb",
+    "Oracle": "oracle",
+    "PostgreSQL": "postgres",
+    "Presto": "presto",
+    "Redis": "redis",
+    "Riak": "riak",
+    "Spanner": "spanner",
+    "SQLServer": "sql_server",
+    "SQLite": "sqlite",
+    "Sybase": "sybase",
+    "Teradata": "teradata",
+    "TiDB": "tidb",
+    "TimescaleDB": "timescaledb",
+    "Vertica": "vertica",
+    "VoltDB": "voltdb",
+}
+
+__all__ = list(_LAZY)
+
+if TYPE_CHECKING:
+    from geniusrise_databases.arangodb import ArangoDB
+    from geniusrise_databases.athena import Athena
+    from geniusrise_databases.azure_table import AzureTableStorage
+    from geniusrise_databases.bigquery import BigQuery
+    from geniusrise_databases.bigtable import Bigtable
+    from geniusrise_databases.cassandra import Cassandra
+    from geniusrise_databases.cloud_sql import GoogleCloudSQL
+    from geniusrise_databases.cockroach import CockroachDB
+    from geniusrise_databases.cosmosdb import CosmosDB
+    from geniusrise_databases.couchbase import Couchbase
+    from geniusrise_databases.db2 import DB2
+    from geniusrise_databases.documentdb import DocumentDB
+    from geniusrise_databases.dynamodb import DynamoDB
+    from geniusrise_databases.elasticsearch import Elasticsearch
+    from geniusrise_databases.firestore import Firestore
+    from geniusrise_databases.graphite import Graphite
+    from geniusrise_databases.hbase import HBase
+    from geniusrise_databases.influxdb import InfluxDB
+    from geniusrise_databases.kairosdb import KairosDB
+    from geniusrise_databases.keyspaces import AWSKeyspaces
+    from geniusrise_databases.ldap import LDAP
+    from geniusrise_databases.memsql import MemSQL
+    from geniusrise_databases.mongodb import MongoDB
+    from geniusrise_databases.mysql import MySQL
+    from geniusrise_databases.neo4j import Neo4j
+    from geniusrise_databases.nuodb import NuoDB
+    from geniusrise_databases.opentsdb import OpenTSDB
+    from geniusrise_databases.oracle import Oracle
+    from geniusrise_databases.postgres import PostgreSQL
+    from geniusrise_databases.presto import Presto
+    from geniusrise_databases.redis import Redis
+    from geniusrise_databases.riak import Riak
+    from geniusrise_databases.spanner import Spanner
+    from geniusrise_databases.sql_server import SQLServer
+    from geniusrise_databases.sqlite import SQLite
+    from geniusrise_databases.sybase import Sybase
+    from geniusrise_databases.teradata import Teradata
+    from geniusrise_databases.tidb import TiDB
+    from geniusrise_databases.timescaledb import TimescaleDB
+    from geniusrise_databases.vertica import Vertica
+    from geniusrise_databases.voltdb import VoltDB
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f"geniusrise_databases.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
@@ -13,9 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+
 import arango
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import CachedState, batch_writer, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(host: str) -> arango.ArangoClient:
+    client = arango.ArangoClient(hosts=host)
+    atexit.register(client.close)
+    return client
+
 
 class ArangoDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -35,7 +47,7 @@ class ArangoDB(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args host=myarangodb.example.com username=myusername password=mypassword database=mydb collection=mycollection
+                --args host=myarangodb.example.com username=myusername password=mypassword database=mydb collection=mycollection batch_size=10000
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -51,6 +63,7 @@ class ArangoDB(Spout):
                     password: "mypassword"
                     database: "mydb"
                     collection: "mycollection"
+                    batch_size: 10000
                 output:
                     type: "batch"
                     args:
@@ -58,7 +71,7 @@ class ArangoDB(Spout):
                         s3_folder: "s3/folder"
         ```
         """
-        super().__init__(output, state)
+        super().__init__(output, CachedState(state))
         self.top_level_arguments = kwargs
 
     def fetch(
@@ -68,6 +81,8 @@ class ArangoDB(Spout):
         password: str,
         database: str,
         collection: str,
+        batch_size: int = 10000,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from an ArangoDB collection and save it in batch.
@@ -78,48 +93,52 @@ class ArangoDB(Spout):
             password (str): The ArangoDB password.
             database (str): The ArangoDB database name.
             collection (str): The name of the ArangoDB collection.
+            batch_size (int): The number of documents to fetch and save per batch. Defaults to 10000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the ArangoDB server or execute the command.
         """
         # Initialize the ArangoDB connection
         try:
-            conn = arango.Connection(host=host, username=username, password=password)
-            db = conn.db(database)
+            db = _get_client(host).db(database, username=username, password=password)
         except Exception as e:
             self.log.error(f"Error connecting to ArangoDB server: {e}")
             return
 
         # Perform the ArangoDB operation
         try:
-            cursor = db[collection].fetch()
-
-            while True:
-                doc = cursor.next()
-                if not doc:
-                    break
-
-                # Save the fetched document to a file
-                self.output.save(doc)
+            cursor = db.aql.execute(
+                "FOR d IN @@col RETURN d",
+                bind_vars={"@col": collection},
+                batch_size=batch_size,
+                stream=True,
+            )
+            processed_docs = 0
+
+            with batch_writer(self.output, output_format, documents=True) as writer:
+                batch = []
+                for doc in cursor:
+                    batch.append(doc)
+                    if len(batch) >= batch_size:
+                        # Save the fetched documents to a file
+                        writer.save(batch)
+                        processed_docs += len(batch)
+                        batch = []
+
+                if batch:
+                    writer.save(batch)
+                    processed_docs += len(batch)
+
+            self.log.info(f"Total documents processed: {processed_docs}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True)
 
         except Exception as e:
             self.log.error(f"Error fetching data from ArangoDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            conn.close()
+            update_state(self.state, self.id, success=False)
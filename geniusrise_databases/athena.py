@@ -13,10 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import boto3
+import functools
 import time
+from typing import Any, Dict, Optional
+
+import boto3
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import CachedState, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(region_name: str):
+    return boto3.client("athena", region_name=region_name)
+
 
 class Athena(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -36,7 +46,7 @@ class Athena(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args region_name=us-east-1 output_location=s3://mybucket/output query="SELECT * FROM mytable"
+                --args region_name=us-east-1 output_location=s3://mybucket/output query="SELECT * FROM mytable" page_size=1000
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -50,6 +60,7 @@ class Athena(Spout):
                     region_name: "us-east-1"
                     output_location: "s3://mybucket/output"
                     query: "SELECT * FROM mytable"
+                    page_size: 1000
                 output:
                     type: "batch"
                     args:
@@ -57,7 +68,7 @@ class Athena(Spout):
                         s3_folder: "s3/folder"
         ```
         """
-        super().__init__(output, state)
+        super().__init__(output, CachedState(state))
         self.top_level_arguments = kwargs
 
     def fetch(
@@ -65,6 +76,10 @@ class Athena(Spout):
         region_name: str,
         output_location: str,
         query: str,
+        page_size: int = 1000,
+        result_reuse_max_age: int = 0,
+        expected_bucket_owner: Optional[str] = None,
+        timeout: float = 3600,
     ):
         """
         📖 Fetch data from an AWS Athena table and save it in batch.
@@ -73,51 +88,74 @@ class Athena(Spout):
             region_name (str): The AWS region name.
             output_location (str): The S3 output location for the query results.
             query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per page. Defaults to 1000.
+            result_reuse_max_age (int): Reuse the results of an identical query run within this many minutes
+                instead of executing it again. Defaults to 0, which disables result reuse.
+            expected_bucket_owner (Optional[str]): The AWS account ID expected to own the output bucket.
+            timeout (float): The maximum number of seconds to wait for the query to finish. Defaults to 3600.
 
         Raises:
             Exception: If unable to connect to the AWS Athena service or execute the query.
         """
-        # Initialize the Athena client
-        athena = boto3.client("athena", region_name=region_name)
+        # Reuse the Athena client across fetches
+        athena = _get_client(region_name)
 
         # Perform the Athena operation
         try:
-            result = athena.start_query_execution(
-                QueryString=query,
-                ResultConfiguration={
-                    "OutputLocation": output_location,
-                },
-            )
+            result_configuration: Dict[str, Any] = {"OutputLocation": output_location}
+            if expected_bucket_owner:
+                result_configuration["ExpectedBucketOwner"] = expected_bucket_owner
+
+            execution_args: Dict[str, Any] = {
+                "QueryString": query,
+                "ResultConfiguration": result_configuration,
+            }
+            if result_reuse_max_age > 0:
+                execution_args["ResultReuseConfiguration"] = {
+                    "ResultReuseByAgeConfiguration": {"Enabled": True, "MaxAgeInMinutes": result_reuse_max_age}
+                }
+
+            result = athena.start_query_execution(**execution_args)
             query_id = result["QueryExecutionId"]
 
+            # Poll for completion with exponential backoff
+            delay = 0.1
+            deadline = time.monotonic() + timeout
             while True:
                 result = athena.get_query_execution(QueryExecutionId=query_id)
                 status = result["QueryExecution"]["Status"]["State"]
-                if status in ["SUCCEEDED", "FAILED"]:
+                if status in ["SUCCEEDED", "FAILED", "CANCELLED"]:
                     break
 
+                if time.monotonic() > deadline:
+                    athena.stop_query_execution(QueryExecutionId=query_id)
+                    raise Exception(f"Athena query {query_id} did not finish within {timeout} seconds")
+
                 # Wait for the query to complete
                 self.log.info(f"Waiting for query to complete ({status})...")
-                time.sleep(5)
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+
+            if status != "SUCCEEDED":
+                reason = result["QueryExecution"]["Status"].get("StateChangeReason", "")
+                raise Exception(f"Athena query {query_id} {status.lower()}: {reason}")
 
-            # Save the query results to a file
-            self.output.save(result["ResultSet"])
+            # Stream the query results page by page
+            processed_rows = 0
+            paginator = athena.get_paginator("get_query_results")
+            for page in paginator.paginate(QueryExecutionId=query_id, PaginationConfig={"PageSize": page_size}):
+                # Save the fetched rows to a file
+                self.output.save(page["ResultSet"])
+
+                # Update the number of processed rows
+                processed_rows += len(page["ResultSet"]["Rows"])
+                self.log.info(f"Total rows processed: {processed_rows}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
         except Exception as e:
             self.log.error(f"Error fetching data from Athena: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
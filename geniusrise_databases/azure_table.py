@@ -13,10 +13,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from azure.cosmosdb.table.models import Entity
-from azure.cosmosdb.table.tableservice import TableService
+import atexit
+import functools
+
+from azure.core.credentials import AzureNamedKeyCredential
+from azure.data.tables import TableClient
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import CachedState, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_table_client(account_name: str, account_key: str, table_name: str) -> TableClient:
+    table_client = TableClient(
+        endpoint=f"https://{account_name}.table.core.windows.net",
+        table_name=table_name,
+        credential=AzureNamedKeyCredential(account_name, account_key),
+    )
+    atexit.register(table_client.close)
+    return table_client
+
 
 class AzureTableStorage(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -36,7 +52,7 @@ class AzureTableStorage(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args account_name=my_account account_key=my_key table_name=my_table
+                --args account_name=my_account account_key=my_key table_name=my_table page_size=1000
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -50,6 +66,7 @@ class AzureTableStorage(Spout):
                     account_name: "my_account"
                     account_key: "my_key"
                     table_name: "my_table"
+                    page_size: 1000
                 output:
                     type: "batch"
                     args:
@@ -57,10 +74,10 @@ class AzureTableStorage(Spout):
                         s3_folder: "s3/folder"
         ```
         """
-        super().__init__(output, state)
+        super().__init__(output, CachedState(state))
         self.top_level_arguments = kwargs
 
-    def fetch(self, account_name: str, account_key: str, table_name: str):
+    def fetch(self, account_name: str, account_key: str, table_name: str, page_size: int = 1000):
         """
         📖 Fetch data from Azure Table Storage and save it in batch.
 
@@ -68,37 +85,34 @@ class AzureTableStorage(Spout):
             account_name (str): The Azure Storage account name.
             account_key (str): The Azure Storage account key.
             table_name (str): The Azure Table Storage table name.
+            page_size (int): The number of entities to fetch per page. Defaults to 1000.
 
         Raises:
             Exception: If unable to connect to Azure Table Storage or fetch the data.
         """
-        table_service = TableService(account_name=account_name, account_key=account_key)
+        table_client = _get_table_client(account_name, account_key, table_name)
 
         try:
-            entities = table_service.query_entities(table_name)
-            fetched_data = [Entity(e) for e in entities]
+            processed_rows = 0
+
+            for page in table_client.list_entities(results_per_page=page_size).by_page():
+                entities = list(page)
+
+                # Save the fetched rows to a file
+                self.output.save(entities)
 
-            # Save the fetched rows to a file
-            self.output.save(fetched_data)
+                # Update the number of processed rows
+                processed_rows += len(entities)
+                self.log.info(f"Total rows processed: {processed_rows}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True)
 
             # Log the total number of rows processed
-            self.log.info(f"Total rows processed: {len(fetched_data)}")
+            self.log.info(f"Total rows processed: {processed_rows}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Azure Table Storage: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
@@ -13,9 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import google.cloud.bigquery as bigquery
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from google.cloud import bigquery_storage
+from google.cloud.bigquery_storage import types
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import CachedState, update_state
+
+
+@functools.lru_cache(maxsize=1)
+def _get_read_client() -> bigquery_storage.BigQueryReadClient:
+    return bigquery_storage.BigQueryReadClient()
+
 
 class BigQuery(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -56,35 +68,80 @@ class BigQuery(Spout):
                         s3_folder: "s3/folder"
         ```
         """
-        super().__init__(output, state)
+        super().__init__(output, CachedState(state))
         self.top_level_arguments = kwargs
 
-    def fetch(self, project_id: str, dataset_id: str, table_id: str):
+    def fetch(self, project_id: str, dataset_id: str, table_id: str, max_stream_count: int = 16):
         """
         📖 Fetch data from a BigQuery table and save it in batch.
 
+        The table is read through the BigQuery Storage Read API, split into up to `max_stream_count`
+        streams which are consumed in parallel.
+
         Args:
             project_id (str): The Google Cloud project ID.
             dataset_id (str): The BigQuery dataset ID.
             table_id (str): The BigQuery table ID.
+            max_stream_count (int): The maximum number of streams to read in parallel. Defaults to 16.
 
         Raises:
-            Exception: If unable to connect to the BigQuery server or execute the query.
+            Exception: If unable to connect to the BigQuery server or read the table.
         """
-        # Initialize BigQuery client
-        client = bigquery.Client(project=project_id)
+        # Reuse the BigQuery Storage client across fetches
+        client = _get_read_client()
+
+        # Open a read session split into parallel Arrow streams
+        session = client.create_read_session(
+            parent=f"projects/{project_id}",
+            read_session=types.ReadSession(
+                table=f"projects/{project_id}/datasets/{dataset_id}/tables/{table_id}",
+                data_format=types.DataFormat.ARROW,
+            ),
+            max_stream_count=max_stream_count,
+        )
 
-        # Execute the query and save the results to a file
-        query = f"SELECT * FROM `{dataset_id}.{table_id}`"
-        results = client.query(query).result()
-        self.output.save(results)
+        processed_rows = 0
+        if session.streams:
+            lock = threading.Lock()
+            with ThreadPoolExecutor(max_workers=len(session.streams)) as executor:
+                processed_rows = sum(
+                    executor.map(lambda stream: self._read_stream(client, session, stream.name, lock), session.streams)
+                )
+
+        self.log.info(f"Total rows processed: {processed_rows}")
 
         # Update the state
-        current_state = self.state.get_state(self.id) or {
-            "success_count": 0,
-            "failure_count": 0,
-            "processed_rows": 0,
-        }
-        current_state["success_count"] += 1
-        current_state["processed_rows"] = len(results)
-        self.state.set_state(self.id, current_state)
+        update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+    def _read_stream(
+        self,
+        client: bigquery_storage.BigQueryReadClient,
+        session: types.ReadSession,
+        stream_name: str,
+        lock: threading.Lock,
+    ) -> int:
+        """
+        Read a single stream of a read session and save its record batches.
+
+        Args:
+            client (BigQueryReadClient): The BigQuery Storage client.
+            session (ReadSession): The read session the stream belongs to.
+            stream_name (str): The name of the stream to read.
+            lock (threading.Lock): Serializes saves across streams.
+
+        Returns:
+            int: The number of rows read from the stream.
+        """
+        processed_rows = 0
+        for page in client.read_rows(stream_name).rows(session).pages:
+            batch = page.to_arrow()
+
+            # Save the fetched rows to a file
+            with lock:
+                self.output.save(batch.to_pylist())
+
+            # Update the number of processed rows
+            processed_rows += batch.num_rows
+            self.log.info(f"Rows processed from {stream_name}: {processed_rows}")
+
+        return processed_rows
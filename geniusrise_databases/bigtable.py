@@ -13,8 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from geniusrise import BatchOutput, Spout, State
 from google.cloud import bigtable
+from google.cloud.bigtable.row_set import RowRange, RowSet
+from google.cloud.bigtable.table import Table
+
+from geniusrise_databases.utils import CachedState, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(project_id: str) -> bigtable.Client:
+    return bigtable.Client(project=project_id)
 
 
 class Bigtable(Spout):
@@ -35,7 +48,7 @@ class Bigtable(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args project_id=my_project instance_id=my_instance table_id=my_table
+                --args project_id=my_project instance_id=my_instance table_id=my_table batch_size=1000
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -49,6 +62,7 @@ class Bigtable(Spout):
                     project_id: "my_project"
                     instance_id: "my_instance"
                     table_id: "my_table"
+                    batch_size: 1000
                 output:
                     type: "batch"
                     args:
@@ -56,10 +70,17 @@ class Bigtable(Spout):
                         s3_folder: "s3/folder"
         ```
         """
-        super().__init__(output, state)
+        super().__init__(output, CachedState(state))
         self.top_level_arguments = kwargs
 
-    def fetch(self, project_id: str, instance_id: str, table_id: str):
+    def fetch(
+        self,
+        project_id: str,
+        instance_id: str,
+        table_id: str,
+        batch_size: int = 1000,
+        parallelism: int = 8,
+    ):
         """
         📖 Fetch data from a Google Cloud Bigtable and save it in batch.
 
@@ -67,39 +88,73 @@ class Bigtable(Spout):
             project_id (str): The Google Cloud Project ID.
             instance_id (str): The Bigtable instance ID.
             table_id (str): The Bigtable table ID.
+            batch_size (int): The number of rows to save per batch. Defaults to 1000.
+            parallelism (int): The number of tablet-aligned shards to scan concurrently. Defaults to 8.
 
         Raises:
             Exception: If unable to connect to the Bigtable server or fetch the data.
         """
-        client = bigtable.Client(project=project_id)
+        client = _get_client(project_id)
         instance = client.instance(instance_id)
         table = instance.table(table_id)
 
         try:
-            rows = table.read_rows()
-            rows.consume_all()
+            # Split the row key space at the tablet boundaries sampled by the server
+            split_keys = [sample.row_key for sample in table.sample_row_keys() if sample.row_key]
+            starts = [None] + split_keys
+            ends = split_keys + [None]
+            shards = []
+            for start_key, end_key in zip(starts, ends):
+                row_set = RowSet()
+                row_set.add_row_range(RowRange(start_key=start_key, end_key=end_key))
+                shards.append(row_set)
 
-            # Save the fetched rows to a file
-            self.output.save(rows)
+            lock = threading.Lock()
+            with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                processed_rows = sum(
+                    executor.map(lambda row_set: self._read_shard(table, row_set, batch_size, lock), shards)
+                )
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
-            self.log.info(f"Total rows processed: {len(rows)}")
+            self.log.info(f"Total rows processed: {processed_rows}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Bigtable: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _read_shard(self, table: Table, row_set: RowSet, batch_size: int, lock: threading.Lock) -> int:
+        """
+        Stream the rows of a single shard and save them in batches.
+
+        Args:
+            table (Table): The Bigtable table.
+            row_set (RowSet): The row range of the shard.
+            batch_size (int): The number of rows to save per batch.
+            lock (threading.Lock): Serializes saves across shards.
+
+        Returns:
+            int: The number of rows read from the shard.
+        """
+        processed_rows = 0
+
+        batch = []
+        for row in table.read_rows(row_set=row_set):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                # Save the fetched rows to a file
+                with lock:
+                    self.output.save(batch)
+                processed_rows += len(batch)
+                batch = []
+
+        if batch:
+            with lock:
+                self.output.save(batch)
+            processed_rows += len(batch)
+
+        return processed_rows
@@ -13,14 +13,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict
-
-from cassandra.cluster import Cluster
-from cassandra.query import SimpleStatement
+import atexit
+import functools
+import weakref
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from cassandra.cluster import Cluster, Session
+from cassandra.concurrent import execute_concurrent
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import BoundStatement, PreparedStatement
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import CachedState, batch_writer, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_cluster(hosts: Tuple[str, ...]) -> Cluster:
+    cluster = Cluster(
+        contact_points=list(hosts),
+        protocol_version=4,
+        load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy()),
+    )
+    atexit.register(cluster.shutdown)
+    return cluster
+
+
+@functools.lru_cache(maxsize=16)
+def _get_session(hosts: Tuple[str, ...], keyspace: str) -> Session:
+    return _get_cluster(hosts).connect(keyspace)
+
+
+def _bind(statement: PreparedStatement, values: Sequence[Any], fetch_size: int) -> BoundStatement:
+    # Set the page size on each execution, the prepared statement is shared by concurrent fetches
+    bound = statement.bind(values)
+    bound.fetch_size = fetch_size
+    return bound
+
 
 class Cassandra(Spout):
+    # Prepared statements per live session, keyed by CQL text
+    _prepared: "weakref.WeakKeyDictionary[Session, Dict[str, PreparedStatement]]" = weakref.WeakKeyDictionary()
+
     def __init__(self, output: BatchOutput, state: State, **kwargs: Any) -> None:
         r"""
         Initialize the Cassandra class.
@@ -60,7 +93,7 @@ class Cassandra(Spout):
                         s3_folder: "s3/folder"
         ```
         """
-        super().__init__(output, state)
+        super().__init__(output, CachedState(state))
         self.top_level_arguments = kwargs
 
     def fetch(
@@ -69,6 +102,10 @@ class Cassandra(Spout):
         keyspace: str,
         query: str,
         page_size: int = 100,
+        table: Optional[str] = None,
+        concurrency: int = 32,
+        batch_size: int = 10000,
+        output_format: str = "json",
     ) -> None:
         """
         📖 Fetch data from a Cassandra database and save it in batch.
@@ -78,36 +115,47 @@ class Cassandra(Spout):
             keyspace (str): The Cassandra keyspace to use.
             query (str): The CQL query to execute.
             page_size (int): The number of rows to fetch per page. Defaults to 100.
+            table (Optional[str]): The table the query reads from. When given, the query must not have a
+                WHERE clause and is split into token-range scans executed in parallel. Defaults to None.
+            concurrency (int): The maximum number of in-flight token-range queries. Defaults to 32.
+            batch_size (int): The number of rows to save per batch. Defaults to 10000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the Cassandra cluster or execute the query.
         """
-        # Initialize Cassandra connection
-        cluster = Cluster(contact_points=hosts.split(","))
-        session = cluster.connect(keyspace)
+        # Reuse the Cassandra cluster and session across fetches
+        cluster = _get_cluster(tuple(hosts.split(",")))
+        session = _get_session(tuple(hosts.split(",")), keyspace)
 
         try:
-            statement = SimpleStatement(query, fetch_size=page_size)
-            rows = session.execute(statement)
+            if table:
+                rows = self._scan_token_ranges(cluster, session, keyspace, table, query, page_size, concurrency)
+            else:
+                rows = session.execute(_bind(self._prepare(session, query), (), page_size))
             processed_rows = 0
 
-            for row in rows:
-                # Save the fetched rows to a file
-                self.output.save(dict(row))
+            with batch_writer(self.output, output_format) as writer:
+                batch = []
+                for row in rows:
+                    batch.append(row._asdict())
+                    if len(batch) >= batch_size:
+                        # Save the fetched rows to a file
+                        writer.save(batch)
+
+                        # Update the number of processed rows
+                        processed_rows += len(batch)
+                        self.log.debug("Processed row %d", processed_rows)
+                        batch = []
 
-                # Update the number of processed rows
-                processed_rows += 1
-                self.log.debug(f"Processed row {processed_rows}")
+                if batch:
+                    writer.save(batch)
+                    processed_rows += len(batch)
 
             # Update the state
-            current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_rows"] = processed_rows
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             self.log.info(f"Total rows processed: {processed_rows}")
 
@@ -115,14 +163,60 @@ class Cassandra(Spout):
             self.log.error(f"Error fetching data from Cassandra: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            session.shutdown()
-            cluster.shutdown()
+            update_state(self.state, self.id, success=False)
+
+    def _scan_token_ranges(
+        self,
+        cluster: Cluster,
+        session: Session,
+        keyspace: str,
+        table: str,
+        query: str,
+        page_size: int,
+        concurrency: int,
+    ) -> Iterator[Any]:
+        """
+        Split the token ring into ranges and scan them concurrently.
+
+        Args:
+            cluster (Cluster): The connected Cassandra cluster.
+            session (Session): The Cassandra session.
+            keyspace (str): The Cassandra keyspace to use.
+            table (str): The table the query reads from.
+            query (str): The CQL query to execute, without a WHERE clause.
+            page_size (int): The number of rows to fetch per page.
+            concurrency (int): The maximum number of in-flight token-range queries.
+
+        Yields:
+            Row: The rows of every token range, in completion order.
+        """
+        partition_key = ", ".join(c.name for c in cluster.metadata.keyspaces[keyspace].tables[table].partition_key)
+        statement = self._prepare(session, f"{query} WHERE token({partition_key}) > ? AND token({partition_key}) <= ?")
+
+        # Murmur3 token bounds, plus one range per token owned in the ring
+        ring = [token.value for token in cluster.metadata.token_map.ring]
+        bounds = [-(2**63)] + ring + [2**63 - 1]
+        ranges = [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+
+        statements = ((_bind(statement, token_range, page_size), None) for token_range in ranges)
+        for success, result in execute_concurrent(session, statements, concurrency=concurrency, results_generator=True):
+            if not success:
+                raise result
+            yield from result
+
+    def _prepare(self, session: Session, query: str) -> PreparedStatement:
+        """
+        Prepare a statement once per session and reuse it on subsequent calls.
+
+        Args:
+            session (Session): The Cassandra session.
+            query (str): The CQL query to prepare.
+
+        Returns:
+            PreparedStatement: The prepared statement.
+        """
+        statements = self._prepared.setdefault(session, {})
+        if query not in statements:
+            statements[query] = session.prepare(query)
+
+        return statements[query]
@@ -13,11 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict
+import asyncio
+from typing import Any, List
 
-import pymysql.cursors  # type: ignore
+import aiomysql  # type: ignore
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import CachedState, batch_writer, gather_bounded, update_state
+
 
 class GoogleCloudSQL(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs: Any) -> None:
@@ -37,7 +40,7 @@ class GoogleCloudSQL(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args host=127.0.0.1 port=3306 user=root password=root database=mydb query="SELECT * FROM table" page_size=100
+                --args host=127.0.0.1 port=3306 user=root password=root database=mydb query="SELECT * FROM table" page_size=10000
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -54,7 +57,7 @@ class GoogleCloudSQL(Spout):
                     password: "root"
                     database: "mydb"
                     query: "SELECT * FROM table"
-                    page_size: 100
+                    page_size: 10000
                 output:
                     type: "batch"
                     args:
@@ -62,7 +65,7 @@ class GoogleCloudSQL(Spout):
                         s3_folder: "s3/folder"
         ```
         """
-        super().__init__(output, state)
+        super().__init__(output, CachedState(state))
         self.top_level_arguments = kwargs
 
     def fetch(
@@ -73,7 +76,8 @@ class GoogleCloudSQL(Spout):
         password: str,
         database: str,
         query: str,
-        page_size: int = 100,
+        page_size: int = 10000,
+        output_format: str = "json",
     ) -> None:
         """
         📖 Fetch data from a Google Cloud SQL database and save it in batch.
@@ -85,63 +89,141 @@ class GoogleCloudSQL(Spout):
             password (str): The Google Cloud SQL password.
             database (str): The Google Cloud SQL database name.
             query (str): The SQL query to execute.
-            page_size (int): The number of rows to fetch per page. Defaults to 100.
+            page_size (int): The number of rows to fetch per page. Defaults to 10000.
+            output_format (str): "json" to save pages as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file per query. Defaults to "json".
+
+        Raises:
+            Exception: If unable to connect to the Google Cloud SQL or fetch the data.
+        """
+        asyncio.run(self.fetch_async(host, port, user, password, database, [query], page_size, 1, output_format))
+
+    def fetch_many(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        queries: List[str],
+        page_size: int = 10000,
+        concurrency: int = 8,
+        output_format: str = "json",
+    ) -> None:
+        """
+        📖 Fetch data for several queries concurrently from a Google Cloud SQL database and save it in batch.
+
+        Args:
+            host (str): The Google Cloud SQL host.
+            port (int): The Google Cloud SQL port.
+            user (str): The Google Cloud SQL user.
+            password (str): The Google Cloud SQL password.
+            database (str): The Google Cloud SQL database name.
+            queries (List[str]): The SQL queries to execute.
+            page_size (int): The number of rows to fetch per page. Defaults to 10000.
+            concurrency (int): The maximum number of queries running at once. Defaults to 8.
+            output_format (str): "json" to save pages as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file per query. Defaults to "json".
+
+        Raises:
+            Exception: If unable to connect to the Google Cloud SQL or fetch the data.
+        """
+        asyncio.run(
+            self.fetch_async(host, port, user, password, database, queries, page_size, concurrency, output_format)
+        )
+
+    async def fetch_async(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        queries: List[str],
+        page_size: int = 10000,
+        concurrency: int = 8,
+        output_format: str = "json",
+    ) -> None:
+        """
+        📖 Fetch data for several queries concurrently on the running event loop.
+
+        Args:
+            host (str): The Google Cloud SQL host.
+            port (int): The Google Cloud SQL port.
+            user (str): The Google Cloud SQL user.
+            password (str): The Google Cloud SQL password.
+            database (str): The Google Cloud SQL database name.
+            queries (List[str]): The SQL queries to execute.
+            page_size (int): The number of rows to fetch per page. Defaults to 10000.
+            concurrency (int): The maximum number of queries running at once. Defaults to 8.
+            output_format (str): "json" to save pages as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file per query. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the Google Cloud SQL or fetch the data.
         """
-        # Initialize Google Cloud SQL connection
-        connection = pymysql.connect(
+        # Initialize Google Cloud SQL connection pool
+        async with aiomysql.create_pool(
             host=host,
             port=port,
             user=user,
             password=password,
-            database=database,
-            cursorclass=pymysql.cursors.DictCursor,
-        )
+            db=database,
+            minsize=1,
+            maxsize=concurrency,
+            cursorclass=aiomysql.SSDictCursor,
+        ) as pool:
+            await gather_bounded(
+                (self._fetch_query(pool, query, page_size, output_format) for query in queries), concurrency
+            )
+
+    async def _fetch_query(self, pool: aiomysql.Pool, query: str, page_size: int, output_format: str) -> None:
+        """
+        Stream the results of a single query and save them in batch.
 
+        Args:
+            pool (aiomysql.Pool): The connection pool to acquire a connection from.
+            query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per page.
+            output_format (str): "json", "jsonl", "jsonl.zst", "msgpack" or "parquet".
+        """
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(query)
-                total_rows = cursor.rowcount
+            async with pool.acquire() as connection, connection.cursor() as cursor:
+                await cursor.execute(query)
                 processed_rows = 0
 
-                while True:
-                    rows = cursor.fetchmany(page_size)
-                    if not rows:
-                        break
+                with batch_writer(self.output, output_format) as writer:
+                    # Save each page while the next one is being fetched
+                    pending = None
+                    try:
+                        while True:
+                            rows = await cursor.fetchmany(page_size)
+                            if not rows:
+                                break
+
+                            # Save the fetched rows to a file
+                            if pending:
+                                await pending
+                            pending = asyncio.create_task(asyncio.to_thread(writer.save, rows))
+
+                            # Update the number of processed rows
+                            processed_rows += len(rows)
+                            self.log.info(f"Total rows processed: {processed_rows}")
+                    finally:
+                        if pending:
+                            await pending
 
-                    # Save the fetched rows to a file
-                    self.output.save(rows)
-
-                    # Update the number of processed rows
-                    processed_rows += len(rows)
-                    self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
-
-                # Update the state
-                current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = processed_rows
-                self.state.set_state(self.id, current_state)
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
-            self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
+            self.log.info(f"Total rows processed: {processed_rows}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Google Cloud SQL: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            connection.close()
+            update_state(self.state, self.id, success=False)
@@ -13,12 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict
+from typing import Any
 
 import psycopg2
 from geniusrise import BatchOutput, Spout, State
 from psycopg2.extras import DictCursor
 
+from geniusrise_databases.utils import update_state
+
 
 class CockroachDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs: Any) -> None:
@@ -120,26 +122,13 @@ class CockroachDB(Spout):
                     self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
 
                 # Update the state
-                current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = processed_rows
-                self.state.set_state(self.id, current_state)
+                update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
         except Exception as e:
             self.log.error(f"Error fetching data from CockroachDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
 
         finally:
             connection.close()
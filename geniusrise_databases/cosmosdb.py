@@ -13,9 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import azure.cosmos.cosmos_client as cosmos_client
+import asyncio
+import functools
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from azure.cosmos.aio import ContainerProxy, CosmosClient
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, Checkpoint, batch_writer, update_state
+
 
 class CosmosDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -64,75 +71,163 @@ class CosmosDB(Spout):
         endpoint: str,
         database: str,
         collection: str,
+        page_size: int = 1000,
+        output_format: str = "json",
+        show_progress: bool = False,
     ):
         """
         📖 Fetch data from a Cosmos DB collection and save it in batch.
 
+        The feed ranges of the collection, one per physical partition, are queried concurrently.
+
         Args:
             endpoint (str): The Cosmos DB endpoint URL.
             database (str): The Cosmos DB database name.
             collection (str): The Cosmos DB collection name.
+            page_size (int): The number of documents to fetch per page. Defaults to 1000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
+            show_progress (bool): Count the documents in the collection up front, with a single server-side
+                aggregation, to log progress against the total. Defaults to False.
 
         Raises:
             Exception: If unable to connect to the Cosmos DB server or execute the query.
         """
-        # Initialize Cosmos DB client
-        client = cosmos_client.CosmosClient(endpoint, {"masterKey": "my_master_key"})
+        # Record the continuation tokens at most every few seconds rather than on every page
+        checkpoint = Checkpoint(self.state, self.id)
 
         try:
-            # Connect to the database and collection
-            database = client.get_database_client(database)  # type: ignore
-            collection = database.get_container_client(collection)  # type: ignore
+            processed_documents, document_count = asyncio.run(
+                self._fetch_async(endpoint, database, collection, page_size, output_format, show_progress, checkpoint)
+            )
 
-            # Get the number of documents in the collection
-            document_count = collection.get_item_count()  # type: ignore
+            # Update the state
+            update_state(
+                self.state,
+                self.id,
+                success=True,
+                fields={"continuation_tokens": {}},
+                processed_documents=processed_documents,
+            )
+
+            # Log the total number of documents processed
+            total = f"/{document_count}" if document_count is not None else ""
+            self.log.info(f"Total documents processed: {processed_documents}{total}")
 
-            # Iterate through each document in the collection
-            processed_documents = 0
-            continuation_token = None
+        except Exception as e:
+            self.log.error(f"Error fetching data from Cosmos DB: {e}")
+
+            # Keep the continuation tokens reached so far to resume from
+            checkpoint.flush()
+
+            # Update the state
+            update_state(self.state, self.id, success=False)
 
-            while True:
-                # Get a batch of documents
-                options = {"partitionKey": "my_partition_key"}
-                if continuation_token:
-                    options["continuation"] = continuation_token
-                response = collection.query_items(query="SELECT * FROM c", options=options)  # type: ignore
+    async def _fetch_async(
+        self,
+        endpoint: str,
+        database: str,
+        collection: str,
+        page_size: int,
+        output_format: str,
+        show_progress: bool,
+        checkpoint: Checkpoint,
+    ) -> Tuple[int, Optional[int]]:
+        """
+        Query every feed range of the collection concurrently and save the pages.
 
-                # Check if there are any documents in the batch
-                if not response:
-                    break
+        Args:
+            endpoint (str): The Cosmos DB endpoint URL.
+            database (str): The Cosmos DB database name.
+            collection (str): The Cosmos DB collection name.
+            page_size (int): The number of documents to fetch per page.
+            output_format (str): "json", "jsonl", "jsonl.zst" or "msgpack".
+            show_progress (bool): Whether to count the documents in the collection.
+            checkpoint (Checkpoint): The checkpoint to record the continuation tokens in.
+
+        Returns:
+            Tuple[int, Optional[int]]: The number of documents processed and, if counted, the number of
+                documents in the collection.
+        """
+        # Initialize Cosmos DB client
+        async with CosmosClient(endpoint, {"masterKey": "my_master_key"}) as client:
+            # Connect to the database and collection
+            container = client.get_database_client(database).get_container_client(collection)
 
-                # Save the batch of documents to a file
-                self.output.save(response)
+            # Get the number of documents in the collection
+            document_count = None
+            if show_progress:
+                document_count = sum([count async for count in container.query_items("SELECT VALUE COUNT(1) FROM c")])
 
-                # Update the number of processed documents
-                processed_documents += len(response)
-                self.log.info(f"Total documents processed: {processed_documents}/{document_count}")
+            # Resume the feed ranges of an interrupted fetch from their continuation tokens, if any
+            current_state = self.state.get_state(self.id) or {}
+            continuation_tokens = current_state.get("continuation_tokens") or {}
 
-                # Get the continuation token
-                continuation_token = response["_continuation_token"]
+            feed_ranges = [feed_range async for feed_range in container.read_feed_ranges()]
 
-            # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_documents": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_documents"] = processed_documents
-            self.state.set_state(self.id, current_state)
+            # Save the pages on a writer thread while the feed ranges fetch their next ones
+            with batch_writer(self.output, output_format, documents=True) as sink, BackgroundWriter(sink) as writer:
+                counts = await asyncio.gather(
+                    *(
+                        self._scan_feed_range(container, feed_range, continuation_tokens, checkpoint, page_size, writer)
+                        for feed_range in feed_ranges
+                    )
+                )
 
-            # Log the total number of documents processed
-            self.log.info(f"Total documents processed: {processed_documents}/{document_count}")
+        return sum(counts), document_count
 
-        except Exception as e:
-            self.log.error(f"Error fetching data from Cosmos DB: {e}")
+    async def _scan_feed_range(
+        self,
+        container: ContainerProxy,
+        feed_range: Dict[str, Any],
+        continuation_tokens: Dict[str, Optional[str]],
+        checkpoint: Checkpoint,
+        page_size: int,
+        writer: BackgroundWriter,
+    ) -> int:
+        """
+        Page through the documents of a single feed range and save them.
 
-            # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_documents": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+        Args:
+            container (ContainerProxy): The Cosmos DB container.
+            feed_range (Dict[str, Any]): The feed range to query.
+            continuation_tokens (Dict[str, Optional[str]]): The continuation token of each feed range,
+                None for feed ranges that were read completely.
+            checkpoint (Checkpoint): The checkpoint to record the continuation token of the feed range in.
+            page_size (int): The number of documents to fetch per page.
+            writer (BackgroundWriter): The writer to queue the pages to.
+
+        Returns:
+            int: The number of documents read from the feed range.
+        """
+        key = json.dumps(feed_range, sort_keys=True)
+        if key in continuation_tokens and continuation_tokens[key] is None:
+            return 0
+
+        processed_documents = 0
+        pager = container.query_items(
+            query="SELECT * FROM c",
+            feed_range=feed_range,
+            max_item_count=page_size,
+        ).by_page(continuation_tokens.get(key))
+
+        async for page in pager:
+            documents = [document async for document in page]
+
+            # Save the batch of documents to a file, then record the continuation token so an
+            # interrupted fetch resumes from the next page
+            await asyncio.to_thread(
+                writer.save,
+                documents,
+                functools.partial(checkpoint.update, continuation_tokens={key: pager.continuation_token}),
+            )
+
+            # Update the number of processed documents
+            processed_documents += len(documents)
+            self.log.info(f"Documents processed from feed range {key}: {processed_documents}")
+
+        # Mark the feed range as read completely once its last page is saved
+        await asyncio.to_thread(writer.save, [], lambda: checkpoint.update(continuation_tokens={key: None}))
+
+        return processed_documents
@@ -13,12 +13,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict
+import atexit
+import functools
+from typing import Any
 
 from couchbase.auth import PasswordAuthenticator
 from couchbase.cluster import Cluster, ClusterOptions
+from couchbase.n1ql import QueryScanConsistency
+from couchbase.options import Compression, QueryOptions
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import LOG_EVERY, batch_writer, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_cluster(host: str, username: str, password: str) -> Cluster:
+    cluster = Cluster(
+        f"couchbase://{host}",
+        ClusterOptions(PasswordAuthenticator(username, password), compression=Compression.INOUT),
+    )
+    atexit.register(cluster.close)
+    return cluster
+
 
 class Couchbase(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs: Any) -> None:
@@ -73,6 +89,7 @@ class Couchbase(Spout):
         bucket_name: str,
         query: str,
         page_size: int = 100,
+        output_format: str = "json",
     ) -> None:
         """
         📖 Fetch data from a Couchbase bucket and save it in batch.
@@ -84,40 +101,40 @@ class Couchbase(Spout):
             bucket_name (str): The Couchbase bucket name.
             query (str): The N1QL query to execute.
             page_size (int): The number of documents to fetch per page. Defaults to 100.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the Couchbase cluster or execute the query.
         """
-        # Initialize Couchbase connection
-        cluster = Cluster(
-            f"couchbase://{host}",
-            ClusterOptions(PasswordAuthenticator(username, password)),
-        )
-        bucket = cluster.bucket(bucket_name)
-        collection = bucket.default_collection()
+        # Reuse the Couchbase connection across fetches
+        cluster = _get_cluster(host, username, password)
 
         try:
-            # Execute the query
-            result = cluster.query(query)
+            # Execute the query as a prepared statement, streaming the rows in batches of page_size
+            options = QueryOptions(
+                adhoc=False,
+                metrics=False,
+                pipeline_batch=page_size,
+                pipeline_cap=page_size * 4,
+                scan_consistency=QueryScanConsistency.NOT_BOUNDED,
+            )
+            result = cluster.query(query, options)
             processed_docs = 0
 
-            for row in result.rows():
-                # Save the fetched document to a file
-                self.output.save(row)
+            with batch_writer(self.output, output_format, page_size, documents=True) as writer:
+                for row in result.rows():
+                    # Write the fetched document to the output
+                    writer.write(row)
 
-                # Update the number of processed documents
-                processed_docs += 1
-                self.log.debug(f"Processed document {processed_docs}")
+                    # Update the number of processed documents
+                    processed_docs += 1
+                    if processed_docs % LOG_EVERY == 0:
+                        self.log.info(f"Total documents processed: {processed_docs}")
 
             # Update the state
-            current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_docs": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_docs"] = processed_docs
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_docs=processed_docs)
 
             self.log.info(f"Total documents processed: {processed_docs}")
 
@@ -125,10 +142,4 @@ class Couchbase(Spout):
             self.log.error(f"Error fetching data from Couchbase: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_docs": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
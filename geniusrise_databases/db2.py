@@ -13,9 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+
 import ibm_db
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import batch_writer, update_state
+
 
 class DB2(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -68,6 +72,8 @@ class DB2(Spout):
         username: str,
         password: str,
         database: str,
+        page_size: int = 1000,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from a DB2 database and save it in batch.
@@ -78,6 +84,10 @@ class DB2(Spout):
             username (str): The DB2 username.
             password (str): The DB2 password.
             database (str): The DB2 database name.
+            page_size (int): The number of rows to save per batch. Defaults to 1000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the DB2 server or execute the command.
@@ -98,34 +108,27 @@ class DB2(Spout):
 
         # Perform the DB2 operation
         try:
-            stmt = ibm_db.exec_immediate(conn, "SELECT * FROM mytable")
+            stmt = ibm_db.prepare(conn, "SELECT * FROM mytable")
+            ibm_db.set_option(stmt, {ibm_db.SQL_ATTR_ROWCOUNT_PREFETCH: ibm_db.SQL_ROWCOUNT_PREFETCH_ON}, 0)
+            ibm_db.execute(stmt)
 
-            while True:
-                row = ibm_db.fetch_assoc(stmt)
-                if not row:
-                    break
+            # Look up the column names once, the shape of every row in the result set
+            columns = [ibm_db.field_name(stmt, i) for i in range(ibm_db.num_fields(stmt))]
 
-                # Save the fetched row to a file
-                self.output.save(row)
+            with batch_writer(self.output, output_format, page_size) as writer:
+                write = writer.write
+                for row in iter(functools.partial(ibm_db.fetch_tuple, stmt), False):
+                    # Write the fetched row to the output
+                    write(dict(zip(columns, row)))
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True)
 
         except Exception as e:
             self.log.error(f"Error fetching data from DB2: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
 
         finally:
             ibm_db.close(conn)
@@ -13,9 +13,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+from typing import Optional
+
+from bson import json_util
 from geniusrise import BatchOutput, Spout, State
 from pymongo import MongoClient
 
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, batched, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(host: str, port: int, user: str, password: str) -> MongoClient:
+    client: MongoClient = MongoClient(
+        host,
+        port,
+        username=user,
+        password=password,
+        compressors="zstd,snappy,zlib",
+        zlibCompressionLevel=1,
+    )
+    atexit.register(client.close)
+    return client
+
 
 class DocumentDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -74,6 +95,8 @@ class DocumentDB(Spout):
         collection: str,
         query: str,
         page_size: int = 100,
+        output_format: str = "json",
+        projection: Optional[str] = None,
     ):
         """
         📖 Fetch data from a DocumentDB database and save it in batch.
@@ -85,38 +108,40 @@ class DocumentDB(Spout):
             password (str): The DocumentDB password.
             database (str): The DocumentDB database name.
             collection (str): The DocumentDB collection name.
-            query (str): The query to execute.
+            query (str): The query filter in MongoDB extended JSON.
             page_size (int): The number of documents to fetch per page. Defaults to 100.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
+            projection (Optional[str]): The fields to return, in MongoDB extended JSON. Defaults to all fields.
 
         Raises:
             Exception: If unable to connect to the DocumentDB server or execute the query.
         """
-        # Initialize DocumentDB connection
-        connection = MongoClient(host, port, username=user, password=password)
-        db = connection[database]
+        # Reuse the DocumentDB connection pool across fetches
+        db = _get_client(host, port, user, password)[database]
         coll = db[collection]
 
         try:
-            cursor = coll.find(eval(query)).limit(page_size)
+            # Parse the query filter and projection
+            filter_doc = json_util.loads(query)
+            projection_doc = json_util.loads(projection) if projection else None
+
+            cursor = coll.find(filter_doc, projection=projection_doc).batch_size(page_size)
             processed_docs = 0
 
-            for doc in cursor:
-                # Save the fetched document to a file
-                self.output.save([doc])
+            # Save each batch on a writer thread while the cursor fetches the next one
+            with batch_writer(self.output, output_format, documents=True) as sink, BackgroundWriter(sink) as writer:
+                for batch in batched(cursor, page_size):
+                    # Save the fetched documents to a file
+                    writer.save(batch)
 
-                # Update the number of processed documents
-                processed_docs += 1
-                self.log.info(f"Total documents processed: {processed_docs}")
+                    # Update the number of processed documents
+                    processed_docs += len(batch)
+                    self.log.info(f"Total documents processed: {processed_docs}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_docs": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_docs"] = processed_docs
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_docs=processed_docs)
 
             # Log the total number of documents processed
             self.log.info(f"Total documents processed: {processed_docs}")
@@ -125,13 +150,4 @@ class DocumentDB(Spout):
             self.log.error(f"Error fetching data from DocumentDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_docs": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            connection.close()
+            update_state(self.state, self.id, success=False)
@@ -13,11 +13,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import threading
 from typing import Any, Dict
 
 import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, Checkpoint, batch_writer, map_threads, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(max_pool_connections: int):
+    return boto3.session.Session().client("dynamodb", config=Config(max_pool_connections=max_pool_connections))
+
+
+_deserializer = TypeDeserializer()
+
 
 class DynamoDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs: Any) -> None:
@@ -37,7 +51,7 @@ class DynamoDB(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args table_name=my_table page_size=100
+                --args table_name=my_table page_size=100 total_segments=8
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -50,6 +64,7 @@ class DynamoDB(Spout):
                 args:
                     table_name: "my_table"
                     page_size: 100
+                    total_segments: 8
                 output:
                     type: "batch"
                     args:
@@ -60,56 +75,57 @@ class DynamoDB(Spout):
         super().__init__(output, state)
         self.top_level_arguments = kwargs
 
-    def fetch(self, table_name: str, page_size: int = 100) -> None:
+    def fetch(
+        self,
+        table_name: str,
+        page_size: int = 100,
+        output_format: str = "json",
+        total_segments: int = 8,
+    ) -> None:
         """
         📖 Fetch data from a DynamoDB table and save it in batch.
 
+        The table is read with a parallel scan of `total_segments` segments, each scanned on its own thread.
+
         Args:
             table_name (str): The DynamoDB table name.
             page_size (int): The number of rows to fetch per page. Defaults to 100.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the rows into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
+            total_segments (int): The number of segments to scan in parallel. Defaults to 8.
 
         Raises:
             Exception: If unable to connect to the DynamoDB or fetch the data.
         """
-        # Initialize DynamoDB client
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(table_name)
-
-        # Initialize variables
-        processed_rows = 0
-        last_evaluated_key = None
-
-        try:
-            while True:
-                if last_evaluated_key:
-                    response = table.scan(Limit=page_size, ExclusiveStartKey=last_evaluated_key)
-                else:
-                    response = table.scan(Limit=page_size)
+        # Reuse the DynamoDB client across fetches, with enough connections for every segment
+        client = _get_client(total_segments * 2)
 
-                items = response.get("Items", [])
-                if not items:
-                    break
+        # Resume the segments of an interrupted fetch from their last evaluated keys, if any
+        current_state = self.state.get_state(self.id) or {}
+        start_keys = current_state.get("segment_start_keys") or {}
 
-                # Save the fetched rows to a file
-                self.output.save(items)
+        # Record the last evaluated keys at most every few seconds rather than on every page
+        checkpoint = Checkpoint(self.state, self.id)
 
-                # Update the number of processed rows
-                processed_rows += len(items)
-                self.log.info(f"Total rows processed: {processed_rows}")
-
-                last_evaluated_key = response.get("LastEvaluatedKey")
-                if not last_evaluated_key:
-                    break
+        try:
+            # Scan the segments in parallel, saving their pages on a single writer thread
+            with batch_writer(self.output, output_format, documents=True) as sink, BackgroundWriter(sink) as writer:
+                stop = threading.Event()
+                processed_rows = sum(
+                    map_threads(
+                        lambda segment: self._scan_segment(
+                            client, table_name, segment, total_segments, page_size, start_keys, checkpoint, writer, stop
+                        ),
+                        range(total_segments),
+                        stop,
+                    )
+                )
 
             # Update the state
-            current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_rows"] = processed_rows
-            self.state.set_state(self.id, current_state)
+            update_state(
+                self.state, self.id, success=True, fields={"segment_start_keys": {}}, processed_rows=processed_rows
+            )
 
             # Log the total number of rows processed
             self.log.info(f"Total rows processed: {processed_rows}")
@@ -117,11 +133,75 @@ class DynamoDB(Spout):
         except Exception as e:
             self.log.error(f"Error fetching data from DynamoDB: {e}")
 
+            # Keep the last evaluated keys of the saved pages to resume from
+            checkpoint.flush()
+
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _scan_segment(
+        self,
+        client: Any,
+        table_name: str,
+        segment: int,
+        total_segments: int,
+        page_size: int,
+        start_keys: Dict[str, Any],
+        checkpoint: Checkpoint,
+        writer: BackgroundWriter,
+        stop: threading.Event,
+    ) -> int:
+        """
+        Scan a single segment of the table and queue its pages to be saved.
+
+        Args:
+            client (DynamoDB.Client): The low-level DynamoDB client.
+            table_name (str): The DynamoDB table name.
+            segment (int): The segment to scan.
+            total_segments (int): The total number of segments.
+            page_size (int): The number of rows to fetch per page.
+            start_keys (Dict[str, Any]): The key to resume each segment after, None for segments
+                that were scanned completely.
+            checkpoint (Checkpoint): The checkpoint to record the progress of the segment in.
+            writer (BackgroundWriter): The writer to queue the pages to.
+            stop (threading.Event): Set when another worker failed, to return without reading the rest.
+
+        Returns:
+            int: The number of rows read from the segment.
+        """
+        key = f"{segment}/{total_segments}"
+        if key in start_keys and start_keys[key] is None:
+            return 0
+
+        processed_rows = 0
+        deserialize = _deserializer.deserialize
+
+        scan_args: Dict[str, Any] = {
+            "TableName": table_name,
+            "Segment": segment,
+            "TotalSegments": total_segments,
+            "Limit": page_size,
+        }
+        if start_keys.get(key):
+            scan_args["ExclusiveStartKey"] = start_keys[key]
+
+        while not stop.is_set():
+            response = client.scan(**scan_args)
+            last_evaluated_key = response.get("LastEvaluatedKey")
+
+            # Save the fetched rows to a file, then record where to resume the segment from
+            items = [{k: deserialize(v) for k, v in item.items()} for item in response["Items"]]
+            writer.save(
+                items,
+                on_saved=functools.partial(checkpoint.update, segment_start_keys={key: last_evaluated_key}),
+            )
+
+            # Update the number of processed rows
+            processed_rows += len(items)
+            self.log.info(f"Rows processed from segment {segment}: {processed_rows}")
+
+            if not last_evaluated_key:
+                break
+            scan_args["ExclusiveStartKey"] = last_evaluated_key
+
+        return processed_rows
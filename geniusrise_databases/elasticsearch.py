@@ -13,11 +13,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+import json
+import threading
 from typing import Any, Dict
 
 from elasticsearch import Elasticsearch as ES
+from elasticsearch.helpers import scan
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, map_threads, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(hosts: str, connections_per_node: int) -> ES:
+    client = ES(hosts.split(","), http_compress=True, connections_per_node=connections_per_node)
+    atexit.register(client.close)
+    return client
+
 
 class Elasticsearch(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs: Any) -> None:
@@ -68,45 +82,53 @@ class Elasticsearch(Spout):
         index: str,
         query: str,
         page_size: int = 100,
+        output_format: str = "json",
+        slices: int = 4,
     ) -> None:
         """
         📖 Fetch data from an Elasticsearch index and save it in batch.
 
+        The index is read with a sliced scroll, each of the `slices` slices scrolled on its own thread.
+
         Args:
             hosts (str): Comma-separated list of Elasticsearch hosts.
             index (str): The Elasticsearch index to query.
             query (str): The Elasticsearch query in JSON format.
-            page_size (int): The number of documents to fetch per page. Defaults to 100.
+            page_size (int): The number of documents to fetch and save per page. Defaults to 100.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
+            slices (int): The number of slices to scroll in parallel. Defaults to 4.
 
         Raises:
             Exception: If unable to connect to the Elasticsearch cluster or execute the query.
         """
-        # Initialize Elasticsearch connection
-        es = ES(hosts.split(","))
+        # Reuse the Elasticsearch connection pool across fetches
+        es = _get_client(hosts, slices + 2)
 
         try:
-            # Execute the query
-            response = es.search(index=index, body=query, size=page_size)
-            hits = response["hits"]["hits"]
-            processed_docs = 0
-
-            for hit in hits:
-                # Save the fetched document to a file
-                self.output.save(hit["_source"])
-
-                # Update the number of processed documents
-                processed_docs += 1
-                self.log.debug(f"Processed document {processed_docs}")
+            # Split the query into slices, a query with a single slice cannot be sliced
+            body = json.loads(query)
+            if slices > 1:
+                slice_queries = [{**body, "slice": {"id": i, "max": slices}} for i in range(slices)]
+            else:
+                slice_queries = [body]
+
+            # Scroll through the slices in parallel, saving their pages on a single writer thread
+            with batch_writer(self.output, output_format, documents=True) as sink, BackgroundWriter(sink) as writer:
+                stop = threading.Event()
+                processed_docs = sum(
+                    map_threads(
+                        lambda slice_id: self._scan_slice(
+                            es, index, slice_queries[slice_id], slice_id, page_size, writer, stop
+                        ),
+                        range(len(slice_queries)),
+                        stop,
+                    )
+                )
 
             # Update the state
-            current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_docs": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_docs"] = processed_docs
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_docs=processed_docs)
 
             self.log.info(f"Total documents processed: {processed_docs}")
 
@@ -114,10 +136,51 @@ class Elasticsearch(Spout):
             self.log.error(f"Error fetching data from Elasticsearch: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_docs": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _scan_slice(
+        self,
+        es: ES,
+        index: str,
+        query: Dict[str, Any],
+        slice_id: int,
+        page_size: int,
+        writer: BackgroundWriter,
+        stop: threading.Event,
+    ) -> int:
+        """
+        Scroll through a single slice of the query and queue its documents to be saved.
+
+        Args:
+            es (Elasticsearch): The Elasticsearch client.
+            index (str): The Elasticsearch index to query.
+            query (Dict[str, Any]): The query of the slice.
+            slice_id (int): The id of the slice.
+            page_size (int): The number of documents to fetch and save per page.
+            writer (BackgroundWriter): The writer to queue the pages to.
+            stop (threading.Event): Set when another worker failed, to return without reading the rest.
+
+        Returns:
+            int: The number of documents read from the slice.
+        """
+        processed_docs = 0
+
+        batch = []
+        for hit in scan(es, index=index, query=query, size=page_size, preserve_order=False):
+            batch.append(hit["_source"])
+            if len(batch) >= page_size:
+                # Save the fetched documents to a file
+                writer.save(batch)
+                processed_docs += len(batch)
+                batch = []
+
+                # Leaving the scan early clears its scroll context
+                if stop.is_set():
+                    return processed_docs
+
+        if batch:
+            writer.save(batch)
+            processed_docs += len(batch)
+
+        self.log.info(f"Documents processed from slice {slice_id}: {processed_docs}")
+        return processed_docs
@@ -13,9 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
 import google.cloud.firestore_v1
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, Checkpoint, batch_writer, batched, update_state
+
+
+def _to_dict(snapshot: google.cloud.firestore_v1.DocumentSnapshot) -> Optional[Dict[str, Any]]:
+    # to_dict() deep-copies the decoded fields, which each streamed snapshot already owns
+    data = getattr(snapshot, "_data", None)
+    return data if data is not None else snapshot.to_dict()
+
 
 class Firestore(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -62,13 +74,32 @@ class Firestore(Spout):
         self,
         project_id: str,
         collection_id: str,
+        batch_size: int = 500,
+        output_format: str = "json",
+        show_progress: bool = False,
+        partitions: int = 1,
+        fields: Optional[List[str]] = None,
     ):
         """
         📖 Fetch data from a Firestore collection and save it in batch.
 
+        The collection is paged through in document name order, so an interrupted fetch resumes after
+        the last saved document. With `partitions` above 1 the collection is instead split into partitions
+        that are streamed in parallel, without resuming.
+
         Args:
             project_id (str): The Google Cloud project ID.
             collection_id (str): The Firestore collection ID.
+            batch_size (int): The number of documents to fetch and save per batch. Defaults to 500.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
+            show_progress (bool): Count the documents in the collection up front, with a single server-side
+                aggregation, to log progress against the total. Defaults to False.
+            partitions (int): The number of partitions to stream in parallel. Partitioned queries run on the
+                collection group, so they also read subcollections with the same ID. Defaults to 1.
+            fields (Optional[List[str]]): The field paths to fetch, to cut the bytes transferred and parsed
+                for wide documents. Defaults to all fields.
 
         Raises:
             Exception: If unable to connect to the Firestore server or execute the query.
@@ -76,53 +107,144 @@ class Firestore(Spout):
         # Initialize Firestore client
         client = google.cloud.firestore_v1.Client(project=project_id)
 
+        # Resume an interrupted fetch after the last saved document, if any
+        current_state = self.state.get_state(self.id) or {}
+        last_document_id = current_state.get("last_document_id")
+
+        # Record the last saved document at most every few seconds rather than on every batch
+        checkpoint = Checkpoint(self.state, self.id)
+
         try:
             # Connect to the collection
             collection = client.collection(collection_id)
 
-            # Get the number of documents in the collection
-            document_count = len(list(collection.stream()))
-
-            # Iterate through each document in the collection
-            documents = list(collection.stream())
-            processed_documents = 0
-
-            while True:
-                # Get a batch of documents
-                batch = list(documents[::100])
-
-                # Check if there are any documents in the batch
-                if not batch:
-                    break
-
-                # Save the batch of documents to a file
-                self.output.save(batch)
-
-                # Update the number of processed documents
-                processed_documents += len(batch)
-                self.log.info(f"Total documents processed: {processed_documents}/{document_count}")
+            # Get the number of documents in the collection with a server-side aggregation
+            total = ""
+            if show_progress:
+                total = f"/{collection.count().get()[0][0].value}"
+
+            # Save each batch on a writer thread while the next one is fetched
+            depth = 2 * partitions
+            with batch_writer(self.output, output_format, documents=True) as sink, BackgroundWriter(
+                sink, depth
+            ) as writer:
+                if partitions > 1:
+                    # Stream the partitions in parallel, saving their batches on the single writer thread
+                    cursors = list(client.collection_group(collection_id).get_partitions(partitions))
+                    with ThreadPoolExecutor(max_workers=len(cursors)) as executor:
+                        processed_documents = sum(
+                            executor.map(
+                                lambda partition: self._stream_partition(partition, fields, batch_size, writer),
+                                cursors,
+                            )
+                        )
+                else:
+                    processed_documents = self._page_collection(
+                        collection, fields, last_document_id, batch_size, total, checkpoint, writer
+                    )
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_documents": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_documents"] = processed_documents
-            self.state.set_state(self.id, current_state)
+            update_state(
+                self.state,
+                self.id,
+                success=True,
+                fields={"last_document_id": None},
+                processed_documents=processed_documents,
+            )
 
             # Log the total number of documents processed
-            self.log.info(f"Total documents processed: {processed_documents}/{document_count}")
+            self.log.info(f"Total documents processed: {processed_documents}{total}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Firestore: {e}")
 
+            # Keep the last saved document to resume from
+            checkpoint.flush()
+
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_documents": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _page_collection(
+        self,
+        collection: google.cloud.firestore_v1.CollectionReference,
+        fields: Optional[List[str]],
+        last_document_id: Optional[str],
+        batch_size: int,
+        total: str,
+        checkpoint: Checkpoint,
+        writer: BackgroundWriter,
+    ) -> int:
+        """
+        Page through the collection in document name order and queue the pages to be saved.
+
+        Args:
+            collection (CollectionReference): The Firestore collection.
+            fields (Optional[List[str]]): The field paths to fetch, None for all fields.
+            last_document_id (Optional[str]): The document to resume after, None to start from the beginning.
+            batch_size (int): The number of documents per page.
+            total (str): The suffix with the total number of documents to log progress with.
+            checkpoint (Checkpoint): The checkpoint to record the last saved document in.
+            writer (BackgroundWriter): The writer to queue the pages to.
+
+        Returns:
+            int: The number of documents read from the collection.
+        """
+        # Page with cursors rather than offsets, which are billed for the skipped reads
+        query = (collection.select(fields) if fields else collection).order_by("__name__").limit(batch_size)
+        processed_documents = 0
+
+        while True:
+            page = query.start_after({"__name__": last_document_id}) if last_document_id else query
+            snapshots = list(page.stream())
+            if not snapshots:
+                break
+
+            # Save the batch of documents to a file, then record where to resume from
+            last_document_id = snapshots[-1].id
+            writer.save(
+                [_to_dict(snapshot) for snapshot in snapshots],
+                on_saved=functools.partial(checkpoint.update, last_document_id=last_document_id),
+            )
+
+            # Update the number of processed documents
+            processed_documents += len(snapshots)
+            self.log.info(f"Total documents processed: {processed_documents}{total}")
+
+            if len(snapshots) < batch_size:
+                break
+
+        return processed_documents
+
+    def _stream_partition(
+        self,
+        partition: google.cloud.firestore_v1.query.QueryPartition,
+        fields: Optional[List[str]],
+        batch_size: int,
+        writer: BackgroundWriter,
+    ) -> int:
+        """
+        Stream a single partition of the collection group and queue its documents to be saved.
+
+        Args:
+            partition (QueryPartition): The partition to stream.
+            fields (Optional[List[str]]): The field paths to fetch, None for all fields.
+            batch_size (int): The number of documents to save per batch.
+            writer (BackgroundWriter): The writer to queue the batches to.
+
+        Returns:
+            int: The number of documents read from the partition.
+        """
+        processed_documents = 0
+
+        query = partition.query()
+        if fields:
+            query = query.select(fields)
+
+        documents = map(_to_dict, query.stream())
+        for batch in batched(documents, batch_size):
+            # Save the batch of documents to a file
+            writer.save(batch)
+            processed_documents += len(batch)
+
+        self.log.info(f"Documents processed from partition: {processed_documents}")
+        return processed_documents
@@ -13,8 +13,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Union
+
+import msgpack
+import orjson
 import requests
 from geniusrise import BatchOutput, Spout, State
+from requests.adapters import HTTPAdapter
+
+from geniusrise_databases.utils import batched, update_state
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    atexit.register(session.close)
+    return session
 
 
 class Graphite(Spout):
@@ -64,58 +84,73 @@ class Graphite(Spout):
     def fetch(
         self,
         url: str,
-        target: str,
+        target: Union[str, List[str]],
         output_format: str = "json",
         from_time: str = "-1h",
         until: str = "now",
+        chunk_size: int = 10000,
+        concurrency: int = 32,
     ):
         """
         📖 Fetch data from a Graphite database and save it in batch.
 
         Args:
             url (str): The Graphite API URL.
-            target (str): The target metric to fetch.
-            output_format (str): The output format. Defaults to "json".
+            target (Union[str, List[str]]): The target metric to fetch, or a list of targets to fetch concurrently.
+            output_format (str): The format Graphite renders the data in, "json" or the more compact "msgpack".
+                Defaults to "json".
             from_time (str): The start time for fetching data. Defaults to "-1h".
             until (str): The end time for fetching data. Defaults to "now".
+            chunk_size (int): The number of series to save per batch. Defaults to 10000.
+            concurrency (int): The maximum number of targets fetched at once. Defaults to 32.
 
         Raises:
             Exception: If unable to connect to the Graphite server or fetch the data.
         """
+        targets = [target] if isinstance(target, str) else list(target)
         params = {
-            "target": target,
             "format": output_format,
             "from": from_time,
             "until": until,
         }
 
         try:
-            response = requests.get(f"{url}/render", params=params)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Save the fetched data to a file
-            self.output.save(data)
+            # Render the targets concurrently, saving each response in order as it completes
+            processed_series = 0
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(targets)))) as executor:
+                for data in executor.map(lambda t: self._render(url, {**params, "target": t}), targets):
+                    # Save the fetched data to files of at most chunk_size series each
+                    for chunk in batched(data, chunk_size):
+                        self.output.save(chunk)
+                    processed_series += len(data)
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True)
 
             # Log the total number of data points fetched
-            self.log.info(f"Total data points fetched: {len(data)}")
+            self.log.info(f"Total data points fetched: {processed_series}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Graphite: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _render(self, url: str, params: Dict[str, Any]) -> List[Any]:
+        """
+        Render a single target and decode the response.
+
+        Args:
+            url (str): The Graphite API URL.
+            params (Dict[str, Any]): The render parameters.
+
+        Returns:
+            List[Any]: The rendered series.
+        """
+        # Reuse the keep-alive connections to the Graphite server across fetches
+        response = _get_session().get(f"{url}/render", params=params)
+        response.raise_for_status()
+
+        if params["format"] == "msgpack":
+            return msgpack.unpackb(response.content, raw=False)
+        return orjson.loads(response.content)
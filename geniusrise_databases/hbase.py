@@ -13,9 +13,40 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import threading
+from typing import List, Tuple
+
 import happybase
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import (
+    BackgroundWriter,
+    ProgressReporter,
+    batch_writer,
+    batched,
+    map_threads,
+    update_state,
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_pool(host: str) -> happybase.ConnectionPool:
+    return happybase.ConnectionPool(16, host=host)
+
+
+def _split_key_range(start: bytes, stop: bytes, parts: int) -> List[Tuple[bytes, bytes]]:
+    # Interpolate split keys between start and stop, read as big-endian integers of equal length
+    width = max(len(start), len(stop))
+    low = int.from_bytes(start.ljust(width, b"\0"), "big")
+    high = int.from_bytes(stop.ljust(width, b"\0"), "big")
+    if parts <= 1 or high - low < parts:
+        return [(start, stop)]
+
+    splits = [(low + (high - low) * i // parts).to_bytes(width, "big") for i in range(1, parts)]
+    bounds = [start] + splits + [stop]
+    return list(zip(bounds, bounds[1:]))
+
 
 class HBase(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -68,45 +99,52 @@ class HBase(Spout):
         row_start: str,
         row_stop: str,
         batch_size: int = 100,
+        output_format: str = "json",
+        workers: int = 1,
     ):
         """
         📖 Fetch data from an HBase table and save it in batch.
 
+        The key range is split into `workers` sub-ranges by interpolating between the start and stop
+        keys, each scanned on its own pooled connection.
+
         Args:
             host (str): The HBase host.
             table (str): The HBase table name.
             row_start (str): The row key to start scanning from.
             row_stop (str): The row key to stop scanning at.
-            batch_size (int): The number of rows to fetch per batch. Defaults to 100.
+            batch_size (int): The number of rows to fetch per scanner RPC and save per batch. Defaults to 100.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows, as dicts of the row key and its columns, into a single
+                newline-delimited JSON, compressed newline-delimited JSON, MessagePack or Parquet file.
+                Defaults to "json".
+            workers (int): The number of sub-ranges to scan in parallel, at most 16. Defaults to 1.
 
         Raises:
             Exception: If unable to connect to the HBase server or execute the scan.
         """
-        # Initialize HBase connection
-        connection = happybase.Connection(host)
-        hbase_table = connection.table(table)
+        # Reuse the pooled HBase connections across fetches
+        pool = _get_pool(host)
 
         try:
-            processed_rows = 0
-            for row_key, data in hbase_table.scan(row_start=row_start, row_stop=row_stop, batch_size=batch_size):
-                rows = [(row_key, data)]
-
-                # Save the fetched rows to a file
-                self.output.save(rows)
-
-                # Update the number of processed rows
-                processed_rows += 1
-                self.log.info(f"Total rows processed: {processed_rows}")
+            key_ranges = _split_key_range(row_start.encode(), row_stop.encode(), min(workers, 16))
+
+            # Scan the sub-ranges in parallel, saving their batches on a single writer thread
+            progress = ProgressReporter(self.log, "rows")
+            with progress, batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                stop = threading.Event()
+                processed_rows = sum(
+                    map_threads(
+                        lambda key_range: self._scan_range(
+                            pool, table, key_range[0], key_range[1], batch_size, output_format, writer, progress, stop
+                        ),
+                        key_ranges,
+                        stop,
+                    )
+                )
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_rows"] = processed_rows
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
             self.log.info(f"Total rows processed: {processed_rows}")
@@ -115,13 +153,63 @@ class HBase(Spout):
             self.log.error(f"Error fetching data from HBase: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            connection.close()
+            update_state(self.state, self.id, success=False)
+
+    def _scan_range(
+        self,
+        pool: happybase.ConnectionPool,
+        table: str,
+        row_start: bytes,
+        row_stop: bytes,
+        batch_size: int,
+        output_format: str,
+        writer: BackgroundWriter,
+        progress: ProgressReporter,
+        stop: threading.Event,
+    ) -> int:
+        """
+        Scan a single key range of the table and queue its rows to be saved.
+
+        Args:
+            pool (ConnectionPool): The HBase connection pool.
+            table (str): The HBase table name.
+            row_start (bytes): The row key to start scanning from.
+            row_stop (bytes): The row key to stop scanning at.
+            batch_size (int): The number of rows to fetch per scanner RPC and save per batch.
+            output_format (str): The output format, see `fetch`.
+            writer (BackgroundWriter): The writer to queue the batches to.
+            progress (ProgressReporter): The reporter to count the rows in.
+            stop (threading.Event): Set when another worker failed, to return without reading the rest.
+
+        Returns:
+            int: The number of rows read from the key range.
+        """
+        processed_rows = 0
+
+        with pool.connection() as connection:
+            # The scanner caches batch_size rows per RPC, save them in batches of the same size
+            scanner = connection.table(table).scan(row_start=row_start, row_stop=row_stop, batch_size=batch_size)
+
+            # File formats need string keys, so turn the (row_key, data) tuples into flat dicts
+            if output_format != "json":
+                decode = bytes.decode
+                scanner = (
+                    {"row_key": row_key, **{decode(column): value for column, value in data.items()}}
+                    for row_key, data in scanner
+                )
+
+            # Bind the per-batch calls to locals, progress is logged by the reporter thread
+            save = writer.save
+            count = progress.add
+            for rows in batched(scanner, batch_size):
+                if stop.is_set():
+                    break
+
+                # Save the fetched rows to a file
+                save(rows)
+
+                # Update the number of processed rows
+                processed_rows += len(rows)
+                count(len(rows))
+
+        return processed_rows
@@ -13,9 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
 import influxdb
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, ProgressReporter, batch_writer, update_state
+
 
 class InfluxDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -68,16 +73,30 @@ class InfluxDB(Spout):
         username: str,
         password: str,
         database: str,
+        chunk_size: int = 10000,
+        workers: int = 8,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from an InfluxDB database and save it in batch.
 
+        With `workers` above 1 every measurement is read with its own chunked query, up to `workers`
+        measurements at a time. With a single worker the whole database is streamed by one chunked
+        query across all measurements, saving the round trips per measurement. Each point is tagged
+        with the name of its measurement.
+
         Args:
             host (str): The InfluxDB host.
             port (int): The InfluxDB port.
             username (str): The InfluxDB username.
             password (str): The InfluxDB password.
             database (str): The InfluxDB database name.
+            chunk_size (int): The number of points the server streams and saves per chunk. Defaults to 10000.
+            workers (int): The number of measurements to query in parallel, 1 to query them all at once.
+                Defaults to 8.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the points into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the InfluxDB server or execute the query.
@@ -88,37 +107,31 @@ class InfluxDB(Spout):
         try:
             # Connect to the database
             with client:
-                # Get the number of measurements in the database
-                measurement_count = len(client.get_list_measurements())
-
-                # Iterate through each measurement in the database
-                cursor = client.get_list_measurements()
-                processed_measurements = 0
-
-                while True:
-                    # Get a batch of measurements
-                    batch = list(cursor.batch(100))
-
-                    # Check if there are any measurements in the batch
-                    if not batch:
-                        break
-
-                    # Save the batch of measurements to a file
-                    self.output.save(batch)
-
-                    # Update the number of processed measurements
-                    processed_measurements += len(batch)
-                    self.log.info(f"Total measurements processed: {processed_measurements}/{measurement_count}")
+                progress = ProgressReporter(self.log, "points")
+                with progress, batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                    if workers > 1:
+                        # Get the measurements in the database
+                        measurements = [measurement["name"] for measurement in client.get_list_measurements()]
+                        measurement_count = len(measurements)
+
+                        # Query the measurements in parallel, saving their chunks on a single writer thread
+                        with ThreadPoolExecutor(max_workers=max(1, min(workers, measurement_count))) as executor:
+                            processed_points = sum(
+                                executor.map(
+                                    lambda measurement: self._fetch_measurement(
+                                        client, measurement, chunk_size, writer, progress
+                                    ),
+                                    measurements,
+                                )
+                            )
+                    else:
+                        # Stream every measurement with a single chunked query
+                        processed_points, measurement_count = self._fetch_all(client, chunk_size, writer, progress)
+                processed_measurements = measurement_count
+                self.log.info(f"Total points processed: {processed_points}")
 
                 # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_measurements": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_measurements"] = processed_measurements
-                self.state.set_state(self.id, current_state)
+                update_state(self.state, self.id, success=True, processed_measurements=processed_measurements)
 
             # Log the total number of measurements processed
             self.log.info(f"Total measurements processed: {processed_measurements}/{measurement_count}")
@@ -127,10 +140,74 @@ class InfluxDB(Spout):
             self.log.error(f"Error fetching data from InfluxDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_measurements": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _fetch_measurement(
+        self,
+        client: influxdb.InfluxDBClient,
+        measurement: str,
+        chunk_size: int,
+        writer: BackgroundWriter,
+        progress: ProgressReporter,
+    ) -> int:
+        """
+        Stream the points of a single measurement in chunks and queue them to be saved.
+
+        Args:
+            client (InfluxDBClient): The InfluxDB client.
+            measurement (str): The name of the measurement.
+            chunk_size (int): The number of points per chunk.
+            writer (BackgroundWriter): The writer to queue the chunks to.
+            progress (ProgressReporter): The reporter to count the points in.
+
+        Returns:
+            int: The number of points read from the measurement.
+        """
+        processed_points = 0
+
+        escaped = measurement.replace("\\", "\\\\").replace('"', '\\"')
+        for result in client.query(f'SELECT * FROM "{escaped}"', chunked=True, chunk_size=chunk_size):
+            points = [{"measurement": measurement, **point} for point in result.get_points()]
+
+            # Save the fetched points to a file
+            writer.save(points)
+            processed_points += len(points)
+            progress.add(len(points))
+
+        self.log.info(f"Points processed from measurement {measurement}: {processed_points}")
+        return processed_points
+
+    def _fetch_all(
+        self,
+        client: influxdb.InfluxDBClient,
+        chunk_size: int,
+        writer: BackgroundWriter,
+        progress: ProgressReporter,
+    ) -> Tuple[int, int]:
+        """
+        Stream the points of every measurement with a single chunked query and queue them to be saved.
+
+        Args:
+            client (InfluxDBClient): The InfluxDB client.
+            chunk_size (int): The number of points per chunk.
+            writer (BackgroundWriter): The writer to queue the chunks to.
+            progress (ProgressReporter): The reporter to count the points in.
+
+        Returns:
+            Tuple[int, int]: The number of points read and the number of measurements they belong to.
+        """
+        processed_points = 0
+        measurements = set()
+
+        for result in client.query("SELECT * FROM /.*/", chunked=True, chunk_size=chunk_size):
+            points: List[Dict[str, Any]] = []
+            for (measurement, _), series in result.items():
+                measurements.add(measurement)
+                points.extend({"measurement": measurement, **point} for point in series)
+
+            # Save the fetched points to a file
+            writer.save(points)
+            processed_points += len(points)
+            progress.add(len(points))
+
+        return processed_points, len(measurements)
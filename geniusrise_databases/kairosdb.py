@@ -13,8 +13,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Union
+
+import orjson
 import requests
 from geniusrise import BatchOutput, Spout, State
+from requests.adapters import HTTPAdapter
+
+from geniusrise_databases.utils import batched, update_state
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    atexit.register(session.close)
+    return session
 
 
 class KairosDB(Spout):
@@ -61,41 +80,53 @@ class KairosDB(Spout):
     def fetch(
         self,
         url: str,
-        query: str,
+        query: Union[str, List[str]],
+        chunk_size: int = 10000,
+        concurrency: int = 32,
     ):
         """
         📖 Fetch data from a KairosDB metric and save it in batch.
 
         Args:
             url (str): The URL of the KairosDB API endpoint.
-            query (str): The SQL query to execute.
+            query (Union[str, List[str]]): The query to execute, or a list of queries to execute concurrently.
+            chunk_size (int): The number of results to save per batch. Defaults to 10000.
+            concurrency (int): The maximum number of queries executed at once. Defaults to 32.
 
         Raises:
             Exception: If unable to connect to the KairosDB server or execute the query.
         """
         # Perform the KairosDB operation
         try:
-            response = requests.get(url, params={"query": query})
-            data = response.json()["results"]
+            queries = [query] if isinstance(query, str) else list(query)
 
-            # Save the query results to a file
-            self.output.save(data)
+            # Execute the queries concurrently, saving each response in order as it completes
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(queries)))) as executor:
+                for data in executor.map(lambda q: self._query(url, q), queries):
+                    # Save the query results to files of at most chunk_size results each
+                    for chunk in batched(data, chunk_size):
+                        self.output.save(chunk)
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True)
 
         except Exception as e:
             self.log.error(f"Error fetching data from KairosDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _query(self, url: str, query: str) -> List[Any]:
+        """
+        Execute a single query and decode its results.
+
+        Args:
+            url (str): The URL of the KairosDB API endpoint.
+            query (str): The query to execute.
+
+        Returns:
+            List[Any]: The query results.
+        """
+        # Reuse the keep-alive connections to the KairosDB server across fetches
+        response = _get_session().get(url, params={"query": query})
+        return orjson.loads(response.content)["results"]
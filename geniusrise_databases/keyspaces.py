@@ -13,9 +13,73 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+import ssl
+from typing import Any, Iterator, List, Sequence, Tuple
+
 import boto3
+from cassandra.cluster import Cluster, Session
+from cassandra.concurrent import execute_concurrent
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import BoundStatement, PreparedStatement, dict_factory
+from cassandra_sigv4.auth import SigV4AuthProvider
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, batched, update_state
+
+# Murmur3 token bounds of the ring
+MIN_TOKEN = -(2**63)
+MAX_TOKEN = 2**63 - 1
+
+
+@functools.lru_cache(maxsize=16)
+def _get_cluster(region_name: str) -> Cluster:
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ssl_context.check_hostname = False
+    ssl_context.load_default_certs()
+
+    cluster = Cluster(
+        [f"cassandra.{region_name}.amazonaws.com"],
+        port=9142,
+        protocol_version=4,
+        compression=True,
+        load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy(local_dc=region_name)),
+        ssl_context=ssl_context,
+        auth_provider=SigV4AuthProvider(boto3.session.Session(region_name=region_name)),
+    )
+    atexit.register(cluster.shutdown)
+    return cluster
+
+
+@functools.lru_cache(maxsize=16)
+def _get_session(region_name: str, keyspace: str) -> Session:
+    session = _get_cluster(region_name).connect(keyspace)
+    session.row_factory = dict_factory
+    return session
+
+
+@functools.lru_cache(maxsize=128)
+def _prepare_range_scan(session: Session, keyspace: str, table_name: str) -> PreparedStatement:
+    table = session.cluster.metadata.keyspaces[keyspace].tables[table_name]
+    partition_key = ", ".join(column.name for column in table.partition_key)
+    return session.prepare(
+        f"SELECT * FROM {table_name} WHERE token({partition_key}) > ? AND token({partition_key}) <= ?"
+    )
+
+
+def _bind(statement: PreparedStatement, values: Sequence[Any], fetch_size: int) -> BoundStatement:
+    # Set the page size on each execution, the prepared statement is shared by concurrent fetches
+    bound = statement.bind(values)
+    bound.fetch_size = fetch_size
+    return bound
+
+
+def _token_ranges(count: int) -> List[Tuple[int, int]]:
+    step = (MAX_TOKEN - MIN_TOKEN) // count
+    bounds = [MIN_TOKEN + i * step for i in range(count)] + [MAX_TOKEN]
+    return list(zip(bounds, bounds[1:]))
+
 
 class AWSKeyspaces(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -35,7 +99,7 @@ class AWSKeyspaces(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args region_name=us-east-1 cluster_name=mycluster table_name=mytable
+                --args region_name=us-east-1 keyspace=mykeyspace table_name=mytable
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -47,7 +111,7 @@ class AWSKeyspaces(Spout):
                 method: "fetch"
                 args:
                     region_name: "us-east-1"
-                    cluster_name: "mycluster"
+                    keyspace: "mykeyspace"
                     table_name: "mytable"
                 output:
                     type: "batch"
@@ -62,49 +126,88 @@ class AWSKeyspaces(Spout):
     def fetch(
         self,
         region_name: str,
-        cluster_name: str,
+        keyspace: str,
         table_name: str,
+        page_size: int = 1000,
+        ranges: int = 64,
+        concurrency: int = 32,
+        batch_size: int = 10000,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from an AWS Keyspaces table and save it in batch.
 
+        The token ring is split into `ranges` equal ranges that are scanned concurrently over CQL.
+
         Args:
             region_name (str): The AWS region name.
-            cluster_name (str): The AWS Keyspaces cluster name.
+            keyspace (str): The AWS Keyspaces keyspace name.
             table_name (str): The name of the AWS Keyspaces table.
+            page_size (int): The number of rows to fetch per page. Defaults to 1000.
+            ranges (int): The number of token ranges to split the table scan into. Defaults to 64.
+            concurrency (int): The maximum number of in-flight token-range queries. Defaults to 32.
+            batch_size (int): The number of rows to save per batch. Defaults to 10000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the AWS Keyspaces cluster or execute the query.
         """
-        # Initialize AWS Keyspaces client
-        client = boto3.client("keyspaces", region_name=region_name)
+        # Reuse the AWS Keyspaces CQL connection across fetches
+        session = _get_session(region_name, keyspace)
 
         # Perform the AWS Keyspaces operation
         try:
-            response = client.query(
-                ClusterName=cluster_name,
-                Cql="SELECT * FROM {}".format(table_name),
-            )
-            data = response["Rows"]
+            rows = self._scan_token_ranges(session, keyspace, table_name, page_size, ranges, concurrency)
+            processed_rows = 0
 
-            # Save the query results to a file
-            self.output.save(data)
+            # Save each batch on a writer thread while the token ranges are scanned
+            with batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                for batch in batched(rows, batch_size):
+                    # Save the query results to a file
+                    writer.save(batch)
+                    processed_rows += len(batch)
+
+            self.log.info(f"Total rows processed: {processed_rows}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
         except Exception as e:
             self.log.error(f"Error fetching data from AWS Keyspaces: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _scan_token_ranges(
+        self,
+        session: Session,
+        keyspace: str,
+        table_name: str,
+        page_size: int,
+        ranges: int,
+        concurrency: int,
+    ) -> Iterator[Any]:
+        """
+        Split the token ring into equal ranges and scan them concurrently.
+
+        Args:
+            session (Session): The AWS Keyspaces session.
+            keyspace (str): The AWS Keyspaces keyspace name.
+            table_name (str): The name of the AWS Keyspaces table.
+            page_size (int): The number of rows to fetch per page.
+            ranges (int): The number of token ranges.
+            concurrency (int): The maximum number of in-flight token-range queries.
+
+        Yields:
+            Dict[str, Any]: The rows of every token range, in completion order.
+        """
+        # Prepare the range scan once per session and table, the server keeps the parsed statement
+        statement = _prepare_range_scan(session, keyspace, table_name)
+
+        statements = ((_bind(statement, token_range, page_size), None) for token_range in _token_ranges(ranges))
+        for success, result in execute_concurrent(session, statements, concurrency=concurrency, results_generator=True):
+            if not success:
+                raise result
+            yield from result
@@ -13,8 +13,51 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import threading
+from typing import Any, Dict, Tuple
+
 import ldap
 from geniusrise import BatchOutput, Spout, State
+from ldap.controls import SimplePagedResultsControl
+
+from geniusrise_databases.utils import BackgroundWriter, update_state
+
+# Bound connections kept open across fetches, keyed by URL, bind DN and a hash of the bind password
+_connections: Dict[Tuple[str, str, str], Any] = {}
+_connections_lock = threading.Lock()
+
+
+def _connection_key(url: str, bind_dn: str, bind_password: str) -> Tuple[str, str, str]:
+    # A fetch with another password must bind again rather than reuse a connection bound with the old one
+    return url, bind_dn, hashlib.sha256(bind_password.encode()).hexdigest()
+
+
+def _get_connection(url: str, bind_dn: str, bind_password: str) -> Any:
+    key = _connection_key(url, bind_dn, bind_password)
+    with _connections_lock:
+        connection = _connections.get(key)
+        if connection is None:
+            connection = ldap.initialize(url)
+            connection.set_option(ldap.OPT_REFERRALS, 0)
+            connection.set_option(ldap.OPT_SIZELIMIT, 0)
+            connection.set_option(ldap.OPT_NETWORK_TIMEOUT, 10)
+            connection.set_option(ldap.OPT_X_KEEPALIVE_IDLE, 30)
+            connection.set_option(ldap.OPT_X_KEEPALIVE_INTERVAL, 10)
+            connection.set_option(ldap.OPT_X_KEEPALIVE_PROBES, 3)
+            connection.bind_s(bind_dn, bind_password)
+            _connections[key] = connection
+        return connection
+
+
+def _drop_connection(url: str, bind_dn: str, bind_password: str) -> None:
+    with _connections_lock:
+        connection = _connections.pop(_connection_key(url, bind_dn, bind_password), None)
+    if connection is not None:
+        try:
+            connection.unbind_s()
+        except ldap.LDAPError:
+            pass
 
 
 class LDAP(Spout):
@@ -70,6 +113,7 @@ class LDAP(Spout):
         search_base: str,
         search_filter: str,
         attributes: list,
+        page_size: int = 1000,
     ):
         """
         📖 Fetch data from an LDAP server and save it in batch.
@@ -81,32 +125,52 @@ class LDAP(Spout):
             search_base (str): The search base.
             search_filter (str): The search filter.
             attributes (list): The list of attributes to retrieve.
+            page_size (int): The number of entries to request and save per page. Defaults to 1000.
 
         Raises:
             Exception: If unable to connect to the LDAP server or execute the search.
         """
-        # Initialize the LDAP connection
+        # Reuse the bound LDAP connection across fetches
         try:
-            connection = ldap.initialize(url)
-            connection.bind_s(bind_dn, bind_password)
+            connection = _get_connection(url, bind_dn, bind_password)
         except ldap.LDAPError as e:
             self.log.error(f"Error binding to LDAP server: {e}")
+            update_state(self.state, self.id, success=False)
             return
 
-        # Perform the search
+        # Perform the search with the paged results control, saving each page as it arrives
+        page_control = SimplePagedResultsControl(True, size=page_size, cookie="")
+        processed_entries = 0
         try:
-            search_result = connection.search_s(search_base, ldap.SCOPE_SUBTREE, search_filter, attributes)
+            # Save each page on a writer thread while the next one is requested
+            with BackgroundWriter(self.output) as writer:
+                while True:
+                    msgid = connection.search_ext(
+                        search_base, ldap.SCOPE_SUBTREE, search_filter, attributes, serverctrls=[page_control]
+                    )
+                    _, entries, _, controls = connection.result3(msgid)
+
+                    # Save the page of search results to a file
+                    writer.save(entries)
+                    processed_entries += len(entries)
+                    self.log.info(f"Total entries processed: {processed_entries}")
+
+                    # Request the next page until the server returns an empty cookie
+                    cookies = [
+                        control.cookie
+                        for control in controls
+                        if control.controlType == SimplePagedResultsControl.controlType
+                    ]
+                    if not cookies or not cookies[0]:
+                        break
+                    page_control.cookie = cookies[0]
         except ldap.LDAPError as e:
             self.log.error(f"Error searching LDAP server: {e}")
-            return
 
-        # Save the search results to a file
-        self.output.save(search_result)
+            # Reconnect on the next fetch
+            _drop_connection(url, bind_dn, bind_password)
+            update_state(self.state, self.id, success=False)
+            return
 
         # Update the state
-        current_state = self.state.get_state(self.id) or {
-            "success_count": 0,
-            "failure_count": 0,
-        }
-        current_state["success_count"] += 1
-        self.state.set_state(self.id, current_state)
+        update_state(self.state, self.id, success=True, processed_entries=processed_entries)
@@ -13,8 +13,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import memsql
+import atexit
+import functools
+
+import pymysql  # type: ignore
 from geniusrise import BatchOutput, Spout, State
+from pymysql.cursors import SSCursor, SSDictCursor  # type: ignore
+
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_connection(host: str, user: str, password: str, database: str) -> pymysql.Connection:
+    # MemSQL speaks the MySQL wire protocol
+    connection = pymysql.connect(host=host, user=user, password=password, database=database)
+    atexit.register(connection.close)
+    return connection
 
 
 class MemSQL(Spout):
@@ -68,6 +82,8 @@ class MemSQL(Spout):
         password: str,
         database: str,
         query: str,
+        page_size: int = 1000,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from a MemSQL database and save it in batch.
@@ -78,41 +94,39 @@ class MemSQL(Spout):
             password (str): The MemSQL password.
             database (str): The MemSQL database name.
             query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch and save per batch. Defaults to 1000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the MemSQL server or execute the query.
         """
-        # Initialize MemSQL connection
-        connection = memsql.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database,
-        )
+        # Reuse the MemSQL connection across fetches
+        connection = _get_connection(host, user, password, database)
 
         try:
-            with connection.cursor() as cursor:
+            processed_rows = 0
+
+            # Stream the results with an unbuffered cursor, saving each batch on a writer thread while the next
+            # one is read off the socket. Parquet takes the row tuples as they are, the other formats need dicts.
+            with connection.cursor(SSCursor if output_format == "parquet" else SSDictCursor) as cursor:
                 cursor.execute(query)
-                data = cursor.fetchall()
+                columns = [column[0] for column in cursor.description]
+                sink = batch_writer(self.output, output_format, columns=columns)
+                with sink, BackgroundWriter(sink) as writer:
+                    while rows := cursor.fetchmany(page_size):
+                        # Save the query results to a file
+                        writer.save(rows)
+                        processed_rows += len(rows)
 
-            # Save the query results to a file
-            self.output.save(data)
+            self.log.info(f"Total rows processed: {processed_rows}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
         except Exception as e:
             self.log.error(f"Error fetching data from MemSQL: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
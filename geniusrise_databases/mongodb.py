@@ -13,8 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import atexit
+import functools
+from typing import Any, Dict, Optional
+
 import pymongo
 from geniusrise import BatchOutput, Spout, State
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.cursor import Cursor
+
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, batched, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(host: str, port: int) -> pymongo.MongoClient:
+    client: pymongo.MongoClient = pymongo.MongoClient(host=host, port=port)
+    atexit.register(client.close)
+    return client
 
 
 class MongoDB(Spout):
@@ -70,6 +86,9 @@ class MongoDB(Spout):
         password: str,
         database: str,
         collection: str,
+        page_size: int = 1000,
+        batch_size: Optional[int] = None,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from a MongoDB database and save it in batch.
@@ -81,49 +100,112 @@ class MongoDB(Spout):
             password (str): The MongoDB password.
             database (str): The MongoDB database name.
             collection (str): The MongoDB collection name.
+            page_size (int): The number of documents to save per batch. Defaults to 1000.
+            batch_size (Optional[int]): The number of documents the server returns per round trip, e.g. 1000 for
+                small documents or 10 for very large ones. Defaults to None, which lets the server size its batches.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the MongoDB server or execute the query.
         """
-        # Initialize MongoDB client
-        client = pymongo.MongoClient(host=host, port=port)  # type: ignore
+        # Reuse the MongoDB connection pool across fetches
+        client = _get_client(host, port)
 
         try:
             # Connect to the database
             db = client[database]
             collection = db[collection]  # type: ignore
 
-            # Get the number of documents in the collection
-            count = collection.count_documents({})  # type: ignore
+            # Estimate the number of documents in the collection from its metadata, without scanning it
+            count = collection.estimated_document_count()  # type: ignore
 
-            # Iterate through each document in the collection
-            cursor = collection.find({})  # type: ignore
+            # Iterate through each document in the collection, in server-sized batches of up to 16 MiB unless
+            # a batch size is given
+            cursor: Cursor[Dict[str, Any]] = collection.find({}, batch_size=batch_size or 0)  # type: ignore
             processed_rows = 0
 
-            while True:
-                # Get a batch of documents
-                batch = list(cursor.batch_size(100))  # type: ignore
+            # Save each batch on a writer thread while the cursor fetches the next one
+            with batch_writer(self.output, output_format, documents=True) as sink, BackgroundWriter(sink) as writer:
+                for batch in batched(cursor, page_size):
+                    # Save the batch of documents to a file
+                    writer.save(batch)
+
+                    # Update the number of processed rows
+                    processed_rows += len(batch)
+                    self.log.info(f"Total rows processed: {processed_rows}/{count}")
+
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+            # Log the total number of rows processed
+            self.log.info(f"Total rows processed: {processed_rows}/{count}")
+
+        except Exception as e:
+            self.log.error(f"Error fetching data from MongoDB: {e}")
+
+            # Update the state
+            update_state(self.state, self.id, success=False)
 
-                # Check if there are any documents in the batch
-                if not batch:
-                    break
+    async def fetch_async(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        database: str,
+        collection: str,
+        page_size: int = 1000,
+        batch_size: Optional[int] = None,
+        output_format: str = "json",
+    ) -> None:
+        """
+        📖 Fetch data from a MongoDB database on the running event loop and save it in batch.
+
+        Args:
+            host (str): The MongoDB host.
+            port (int): The MongoDB port.
+            username (str): The MongoDB username.
+            password (str): The MongoDB password.
+            database (str): The MongoDB database name.
+            collection (str): The MongoDB collection name.
+            page_size (int): The number of documents to save per batch. Defaults to 1000.
+            batch_size (Optional[int]): The number of documents the server returns per round trip. Defaults to None,
+                which lets the server size its batches.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst" or "msgpack" to
+                write the documents into a single newline-delimited JSON, compressed newline-delimited JSON or
+                MessagePack file. Defaults to "json".
+
+        Raises:
+            Exception: If unable to connect to the MongoDB server or execute the query.
+        """
+        # Initialize the MongoDB client on the running event loop
+        client: AsyncIOMotorClient = AsyncIOMotorClient(host=host, port=port)
+
+        try:
+            # Connect to the database
+            documents = client[database][collection]
+
+            # Estimate the number of documents in the collection from its metadata, without scanning it
+            count = await documents.estimated_document_count()
+
+            # Iterate through each document in the collection
+            cursor = documents.find({}, batch_size=batch_size or 0)
+            processed_rows = 0
 
-                # Save the batch of documents to a file
-                self.output.save(batch)
+            # Save each batch on a writer thread while the cursor fetches the next one
+            with batch_writer(self.output, output_format, documents=True) as sink, BackgroundWriter(sink) as writer:
+                while batch := await cursor.to_list(page_size):
+                    # Save the batch of documents to a file
+                    await asyncio.to_thread(writer.save, batch)
 
-                # Update the number of processed rows
-                processed_rows += len(batch)
-                self.log.info(f"Total rows processed: {processed_rows}/{count}")
+                    # Update the number of processed rows
+                    processed_rows += len(batch)
+                    self.log.info(f"Total rows processed: {processed_rows}/{count}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_rows"] = processed_rows
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
             self.log.info(f"Total rows processed: {processed_rows}/{count}")
@@ -132,14 +214,7 @@ class MongoDB(Spout):
             self.log.error(f"Error fetching data from MongoDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
 
         finally:
-            # Close the MongoDB client
             client.close()
@@ -13,9 +13,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import atexit
+import functools
+import logging
+
 import neo4j
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, batched, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_driver(uri: str, username: str, password: str) -> neo4j.Driver:
+    driver = neo4j.GraphDatabase.driver(uri, auth=(username, password))
+    atexit.register(driver.close)
+    return driver
+
+
+async def _count_nodes(tx: neo4j.AsyncManagedTransaction) -> int:
+    result = await tx.run("MATCH (n) RETURN count(n)")
+    record = await result.single()
+    return record[0]
+
 
 class Neo4j(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -66,6 +86,9 @@ class Neo4j(Spout):
         port: int,
         username: str,
         password: str,
+        page_size: int = 500,
+        output_format: str = "json",
+        compute_counts: bool = False,
     ):
         """
         📖 Fetch data from a Neo4j database and save it in batch.
@@ -75,68 +98,118 @@ class Neo4j(Spout):
             port (int): The Neo4j port.
             username (str): The Neo4j username.
             password (str): The Neo4j password.
+            page_size (int): The number of nodes to save per batch. Defaults to 500.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the nodes into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
+            compute_counts (bool): Whether to count the nodes up front to log progress against the total.
+                Defaults to False.
 
         Raises:
             Exception: If unable to connect to the Neo4j server or execute the query.
         """
-        # Initialize Neo4j client
-        client = neo4j.GraphDatabase.driver(f"bolt://{host}:{port}", auth=(username, password))
+        # Reuse the Neo4j driver and its connection pool across fetches
+        client = _get_driver(f"bolt://{host}:{port}", username, password)
 
         try:
-            # Connect to the database
-            with client.session() as session:
-                # Get the number of nodes and relationships in the database
-                node_count = session.run("MATCH (n) RETURN count(n)").single()["count(n)"]
-                relationship_count = session.run("MATCH ()-[r]->() RETURN count(r)").single()["count(r)"]
-
-                # Iterate through each node and relationship in the database
-                cursor = session.run("MATCH (n) RETURN n, labels(n), properties(n)")
+            # Connect to the database, streaming records from the server in batches of page_size
+            with client.session(fetch_size=page_size) as session:
+                # Get the number of nodes in the database, only when asked for as it is used only in the logs
+                total = ""
+                if compute_counts and self.log.isEnabledFor(logging.INFO):
+                    node_count = session.execute_read(lambda tx: tx.run("MATCH (n) RETURN count(n)").single()[0])
+                    total = f"/{node_count}"
+
+                # Iterate through each node in the database
+                result = session.run(
+                    "MATCH (n) RETURN elementId(n) AS id, labels(n) AS labels, properties(n) AS properties"
+                )
                 processed_nodes = 0
-                processed_relationships = 0
 
-                while True:
-                    # Get a batch of nodes and relationships
-                    batch = list(cursor.batch_size(100))
+                # Save each batch on a writer thread while the driver streams the next one
+                with batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                    for records in batched(result, page_size):
+                        # Save the batch of nodes to a file
+                        writer.save([record.data() for record in records])
 
-                    # Check if there are any nodes or relationships in the batch
-                    if not batch:
-                        break
+                        # Update the number of processed nodes
+                        processed_nodes += len(records)
+                        self.log.info(f"Total nodes processed: {processed_nodes}{total}")
 
-                    # Save the batch of nodes and relationships to a file
-                    self.output.save(batch)
+                # Update the state
+                update_state(self.state, self.id, success=True, processed_nodes=processed_nodes)
 
-                    # Update the number of processed nodes and relationships
-                    processed_nodes += len([n for n, _, _ in batch])
-                    processed_relationships += len([r for _, _, r in batch])
-                    self.log.info(
-                        f"Total nodes processed: {processed_nodes}/{node_count}, total relationships processed: {processed_relationships}/{relationship_count}"
-                    )
+            # Log the total number of nodes processed
+            self.log.info(f"Total nodes processed: {processed_nodes}{total}")
 
-                # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_nodes": 0,
-                    "processed_relationships": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_nodes"] = processed_nodes
-                current_state["processed_relationships"] = processed_relationships
-                self.state.set_state(self.id, current_state)
-
-            # Log the total number of nodes and relationships processed
-            self.log.info(
-                f"Total nodes processed: {processed_nodes}/{node_count}, total relationships processed: {processed_relationships}/{relationship_count}"
-            )
+        except Exception as e:
+            self.log.error(f"Error fetching data from Neo4j: {e}")
+
+            # Update the state
+            update_state(self.state, self.id, success=False)
+
+    async def fetch_async(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        page_size: int = 500,
+        output_format: str = "json",
+        compute_counts: bool = False,
+    ) -> None:
+        """
+        📖 Fetch data from a Neo4j database on the running event loop and save it in batch.
+
+        Args:
+            host (str): The Neo4j host.
+            port (int): The Neo4j port.
+            username (str): The Neo4j username.
+            password (str): The Neo4j password.
+            page_size (int): The number of nodes to save per batch. Defaults to 500.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the nodes into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
+            compute_counts (bool): Whether to count the nodes up front to log progress against the total.
+                Defaults to False.
+
+        Raises:
+            Exception: If unable to connect to the Neo4j server or execute the query.
+        """
+        try:
+            # Initialize the Neo4j driver on the running event loop
+            driver = neo4j.AsyncGraphDatabase.driver(f"bolt://{host}:{port}", auth=(username, password))
+            async with driver as client, client.session(fetch_size=page_size) as session:
+                # Get the number of nodes in the database, only when asked for as it is used only in the logs
+                total = ""
+                if compute_counts and self.log.isEnabledFor(logging.INFO):
+                    node_count = await session.execute_read(_count_nodes)
+                    total = f"/{node_count}"
+
+                # Iterate through each node in the database
+                result = await session.run(
+                    "MATCH (n) RETURN elementId(n) AS id, labels(n) AS labels, properties(n) AS properties"
+                )
+                processed_nodes = 0
+
+                # Save each batch on a writer thread while the driver streams the next one
+                with batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                    while records := await result.fetch(page_size):
+                        # Save the batch of nodes to a file
+                        await asyncio.to_thread(writer.save, [record.data() for record in records])
+
+                        # Update the number of processed nodes
+                        processed_nodes += len(records)
+                        self.log.info(f"Total nodes processed: {processed_nodes}{total}")
+
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_nodes=processed_nodes)
+
+            # Log the total number of nodes processed
+            self.log.info(f"Total nodes processed: {processed_nodes}{total}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Neo4j: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_docs": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
@@ -13,9 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+from typing import Any, Optional
+
 import nuodb
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_session(url: str) -> Any:
+    return nuodb.Session(url)
+
 
 class NuoDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -62,42 +72,70 @@ class NuoDB(Spout):
         self,
         url: str,
         query: str,
+        page_size: int = 1000,
+        output_format: str = "json",
+        order_by: Optional[str] = None,
     ):
         """
         📖 Fetch data from a NuoDB table and save it in batch.
 
+        With `order_by`, the query is read in pages of `page_size` rows with keyset pagination, each page
+        starting after the last key of the one before, so the server never holds more than a page open.
+
         Args:
             url (str): The URL of the NuoDB API endpoint.
             query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch and save per batch. Defaults to 1000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
+            order_by (Optional[str]): A unique column of the query results to paginate on. Defaults to None,
+                which streams the query on a single cursor.
 
         Raises:
             Exception: If unable to connect to the NuoDB server or execute the query.
         """
         # Perform the NuoDB operation
         try:
-            session = nuodb.Session(url)
+            # Reuse the NuoDB session across fetches
+            session = _get_session(url)
             cursor = session.cursor()
-            cursor.execute(query)
-            data = cursor.fetchall()
+            if order_by:
+                page = f"SELECT * FROM ({query}) AS sub"
+                cursor.execute(f"{page} ORDER BY {order_by} LIMIT {page_size}")
+            else:
+                cursor.execute(query)
+            processed_rows = 0
+
+            # Parquet transposes the row tuples into columns as they are, the other file formats need dicts
+            columns = [column[0] for column in cursor.description]
+            as_dicts = output_format not in ("json", "parquet")
+            if order_by:
+                key = [column.lower() for column in columns].index(order_by.lower())
+
+            # Save each batch on a writer thread while the cursor fetches the next one
+            with batch_writer(self.output, output_format, columns=columns) as sink, BackgroundWriter(sink) as writer:
+                while rows := cursor.fetchmany(page_size):
+                    # A full page may not be the last one, so query the page after its last key
+                    if order_by and len(rows) == page_size:
+                        cursor.execute(
+                            f"{page} WHERE {order_by} > ? ORDER BY {order_by} LIMIT {page_size}", [rows[-1][key]]
+                        )
+
+                    if as_dicts:
+                        rows = [dict(zip(columns, row)) for row in rows]
+
+                    # Save the query results to a file
+                    writer.save(rows)
+                    processed_rows += len(rows)
 
-            # Save the query results to a file
-            self.output.save(data)
+            self.log.info(f"Total rows processed: {processed_rows}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
         except Exception as e:
             self.log.error(f"Error fetching data from NuoDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
@@ -13,8 +13,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import opentsdb
+import atexit
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import orjson
+import requests
 from geniusrise import BatchOutput, Spout, State
+from requests.adapters import HTTPAdapter
+
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, batched, update_state
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    atexit.register(session.close)
+    return session
 
 
 class OpenTSDB(Spout):
@@ -35,7 +54,7 @@ class OpenTSDB(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args host=http://localhost:4242
+                --args host=http://localhost:4242 start=1h-ago
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -47,6 +66,7 @@ class OpenTSDB(Spout):
                 method: "fetch"
                 args:
                     host: "http://localhost:4242"
+                    start: "1h-ago"
                 output:
                     type: "batch"
                     args:
@@ -60,53 +80,62 @@ class OpenTSDB(Spout):
     def fetch(
         self,
         host: str,
+        metrics: Optional[List[str]] = None,
+        start: str = "1h-ago",
+        end: Optional[str] = None,
+        aggregator: str = "none",
+        max_metrics: int = 100000,
+        chunk_size: int = 100,
+        concurrency: int = 16,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from an OpenTSDB database and save it in batch.
 
+        Each metric is queried over the HTTP API on its own request, up to `concurrency` at once.
+
         Args:
             host (str): The URL of the OpenTSDB instance.
+            metrics (Optional[List[str]]): The metrics to fetch. Defaults to every metric in the database.
+            start (str): The start time of the query. Defaults to "1h-ago".
+            end (Optional[str]): The end time of the query. Defaults to now.
+            aggregator (str): The aggregator to combine the time series of a metric with. Defaults to "none".
+            max_metrics (int): The maximum number of metric names to list when `metrics` is not given.
+                Defaults to 100000.
+            chunk_size (int): The number of time series to save per batch. Defaults to 100.
+            concurrency (int): The maximum number of metrics queried at once. Defaults to 16.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the time series into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the OpenTSDB server or execute the query.
         """
-        # Initialize OpenTSDB client
-        client = opentsdb.Client(host)
-
         try:
-            # Connect to the database
-            with client:
-                # Get the number of metrics in the database
-                metric_count = len(client.metrics())
-
-                # Iterate through each metric in the database
-                cursor = client.metrics()
-                processed_metrics = 0
-
-                while True:
-                    # Get a batch of metrics
-                    batch = list(cursor.batch(100))
-
-                    # Check if there are any metrics in the batch
-                    if not batch:
-                        break
-
-                    # Save the batch of metrics to a file
-                    self.output.save(batch)
-
-                    # Update the number of processed metrics
-                    processed_metrics += len(batch)
-                    self.log.info(f"Total metrics processed: {processed_metrics}/{metric_count}")
-
-                # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_metrics": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_metrics"] = processed_metrics
-                self.state.set_state(self.id, current_state)
+            # Get the metrics in the database
+            if metrics is None:
+                metrics = self._suggest_metrics(host, max_metrics)
+            metric_count = len(metrics)
+            processed_metrics = 0
+
+            query: Dict[str, Any] = {"start": start}
+            if end:
+                query["end"] = end
+
+            # Query the metrics concurrently, saving their time series on a writer thread in metric order
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, metric_count))) as executor:
+                with batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                    for series in executor.map(lambda m: self._query(host, query, aggregator, m), metrics):
+                        # Save the time series of the metric to files of at most chunk_size series each
+                        for chunk in batched(series, chunk_size):
+                            writer.save(chunk)
+
+                        # Update the number of processed metrics
+                        processed_metrics += 1
+                        self.log.info(f"Total metrics processed: {processed_metrics}/{metric_count}")
+
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_metrics=processed_metrics)
 
             # Log the total number of metrics processed
             self.log.info(f"Total metrics processed: {processed_metrics}/{metric_count}")
@@ -115,10 +144,41 @@ class OpenTSDB(Spout):
             self.log.error(f"Error fetching data from OpenTSDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_metrics": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _suggest_metrics(self, host: str, max_metrics: int) -> List[str]:
+        """
+        List the metric names in the database.
+
+        Args:
+            host (str): The URL of the OpenTSDB instance.
+            max_metrics (int): The maximum number of metric names to list.
+
+        Returns:
+            List[str]: The metric names.
+        """
+        response = _get_session().get(f"{host}/api/suggest", params={"type": "metrics", "max": max_metrics})
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def _query(self, host: str, query: Dict[str, Any], aggregator: str, metric: str) -> List[Any]:
+        """
+        Query the time series of a single metric.
+
+        Args:
+            host (str): The URL of the OpenTSDB instance.
+            query (Dict[str, Any]): The time range of the query.
+            aggregator (str): The aggregator to combine the time series with.
+            metric (str): The metric to query.
+
+        Returns:
+            List[Any]: The time series of the metric.
+        """
+        # Reuse the keep-alive connections to the OpenTSDB server across metrics and fetches
+        response = _get_session().post(
+            f"{host}/api/query",
+            data=orjson.dumps({**query, "queries": [{"aggregator": aggregator, "metric": metric}]}),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
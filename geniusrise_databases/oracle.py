@@ -13,9 +13,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+from typing import Any, Dict, Optional
+
 import cx_Oracle
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, batch_writer, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_pool(server: str, port: int, service_name: str, user: str, password: str) -> cx_Oracle.SessionPool:
+    pool = cx_Oracle.SessionPool(
+        user=user,
+        password=password,
+        dsn=cx_Oracle.makedsn(server, port, service_name=service_name),
+        min=2,
+        max=10,
+        increment=1,
+        threaded=True,
+        # Keep the parsed statements of each pooled session, so repeated queries skip the parse
+        stmtcachesize=50,
+    )
+    atexit.register(pool.close)
+    return pool
+
 
 class Oracle(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -69,6 +92,9 @@ class Oracle(Spout):
         user: str,
         password: str,
         query: str,
+        arraysize: int = 5000,
+        output_format: str = "json",
+        params: Optional[Dict[str, Any]] = None,
     ):
         """
         📖 Fetch data from an Oracle SQL database and save it in batch.
@@ -80,41 +106,49 @@ class Oracle(Spout):
             user (str): The Oracle user.
             password (str): The Oracle password.
             query (str): The SQL query to execute.
+            arraysize (int): The number of rows to fetch per round trip and save per batch. Defaults to 5000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
+            params (Optional[Dict[str, Any]]): The values of the `:name` bind variables in the query, which keep
+                the query text, and so its cached statement, the same across fetches. Defaults to None.
 
         Raises:
             Exception: If unable to connect to the Oracle SQL server or execute the query.
         """
-        # Initialize Oracle SQL connection
-        connection_string = f"oracle://{user}/{password}@{server}:{port}/{service_name}"
-        connection = cx_Oracle.connect(connection_string)
+        # Acquire a session from the Oracle SQL session pool, kept open across fetches
+        pool = _get_pool(server, port, service_name, user, password)
+        connection = pool.acquire()
 
         try:
             with connection.cursor() as cursor:
-                cursor.execute(query)
+                # Fetch arraysize rows per round trip, with prefetchrows one above it as cx_Oracle recommends
+                cursor.arraysize = arraysize
+                cursor.prefetchrows = arraysize + 1
+                cursor.execute(query, params or {})
                 total_rows = cursor.rowcount
                 processed_rows = 0
 
-                while True:
-                    rows = cursor.fetchmany()
-                    if not rows:
-                        break
+                # Parquet transposes the row tuples into columns as they are, the other file formats need dicts
+                columns = [column[0] for column in cursor.description]
+                as_dicts = output_format not in ("json", "parquet")
+
+                # Save each batch on a writer thread while the cursor fetches the next one
+                sink = batch_writer(self.output, output_format, columns=columns)
+                with sink, BackgroundWriter(sink) as writer:
+                    while rows := cursor.fetchmany(arraysize):
+                        if as_dicts:
+                            rows = [dict(zip(columns, row)) for row in rows]
 
-                    # Save the fetched rows to a file
-                    self.output.save(rows)
+                        # Save the fetched rows to a file
+                        writer.save(rows)
 
-                    # Update the number of processed rows
-                    processed_rows += len(rows)
-                    self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
+                        # Update the number of processed rows
+                        processed_rows += len(rows)
+                        self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
 
                 # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = processed_rows
-                self.state.set_state(self.id, current_state)
+                update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
             self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
@@ -123,13 +157,7 @@ class Oracle(Spout):
             self.log.error(f"Error fetching data from Oracle SQL: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
 
         finally:
-            connection.close()
+            pool.release(connection)
@@ -17,6 +17,8 @@ import psycopg2
 from geniusrise import BatchOutput, Spout, State
 from psycopg2.extras import DictCursor
 
+from geniusrise_databases.utils import update_state
+
 
 class PostgreSQL(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -118,14 +120,7 @@ class PostgreSQL(Spout):
                     self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
 
                 # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = processed_rows
-                self.state.set_state(self.id, current_state)
+                update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
             self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
@@ -134,13 +129,7 @@ class PostgreSQL(Spout):
             self.log.error(f"Error fetching data from PostgreSQL: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
 
         finally:
             connection.close()
@@ -13,8 +13,45 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import prestodb
+import atexit
+import functools
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
+
 from geniusrise import BatchOutput, Spout, State
+from trino.auth import BasicAuthentication
+from trino.dbapi import connect
+
+from geniusrise_databases.utils import (
+    BackgroundWriter,
+    ConnectionPool,
+    ProgressReporter,
+    batch_writer,
+    split_range,
+    update_state,
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_pool(host: str, port: int, username: str, password: str) -> ConnectionPool:
+    pool = ConnectionPool(
+        functools.partial(
+            connect,
+            host=host,
+            port=port,
+            user=username,
+            auth=BasicAuthentication(username, password),
+            http_scheme="https",
+            request_timeout=3600,
+        )
+    )
+    atexit.register(pool.close)
+    return pool
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
 
 
 class Presto(Spout):
@@ -70,6 +107,15 @@ class Presto(Spout):
         catalog: str,
         schema: str,
         table: str,
+        page_size: int = 1000,
+        output_format: str = "json",
+        partition_column: Optional[str] = None,
+        partitions: int = 1,
+        mode: str = "fetch",
+        unload_catalog: str = "hive",
+        unload_schema: str = "tmp",
+        port: int = 443,
+        columns: Optional[List[str]] = None,
     ):
         """
         📖 Fetch data from a Presto table and save it in batch.
@@ -81,48 +127,221 @@ class Presto(Spout):
             catalog (str): The Presto catalog name.
             schema (str): The Presto schema name.
             table (str): The name of the Presto table.
+            page_size (int): The number of rows to save per batch. Defaults to 1000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
+            partition_column (Optional[str]): A numeric or date column of the table to split the scan on, so
+                that its ranges are read in parallel. Defaults to None.
+            partitions (int): The number of ranges to split the scan into, at most 10 run at once. Defaults to 1.
+            mode (str): "fetch" to read the rows through this spout, or "unload" to have the Presto workers
+                write the table as Parquet straight to a new subfolder of the S3 folder of the output. Defaults
+                to "fetch".
+            unload_catalog (str): The Hive catalog to create the temporary export table in. Defaults to "hive".
+            unload_schema (str): The schema to create the temporary export table in. Defaults to "tmp".
+            port (int): The HTTPS port of the Presto coordinator. Defaults to 443.
+            columns (Optional[List[str]]): The columns to read, so that the other columns are never sent
+                over. Defaults to all columns.
 
         Raises:
             Exception: If unable to connect to the Presto server or execute the command.
         """
-        # Initialize the Presto connection
-        try:
-            conn = prestodb.connect(host=host, user=username, password=password)
-        except Exception as e:
-            self.log.error(f"Error connecting to Presto server: {e}")
-            return
+        # Reuse the pooled Presto connections across fetches
+        pool = _get_pool(host, port, username, password)
 
         # Perform the Presto operation
         try:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM {catalog}.{schema}.{table}")
+            # Quote the identifiers, so that names given on the command line can't inject SQL
+            table_name = ".".join(_quote(name) for name in (catalog, schema, table))
+            projection = ", ".join(map(_quote, columns)) if columns else "*"
+
+            if mode == "unload":
+                # Export the table from the Presto workers in parallel, no rows pass through this spout
+                processed_rows = self._unload(pool, table_name, projection, unload_catalog, unload_schema)
+            elif partition_column and partitions > 1:
+                # Scan ranges of the partition column in parallel, each on its own pooled connection
+                processed_rows = self._fetch_partitions(
+                    pool, table_name, projection, _quote(partition_column), partitions, page_size, output_format
+                )
+            else:
+                with pool.connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.arraysize = page_size
+                    cursor.execute(f"SELECT {projection} FROM {table_name}")
+                    processed_rows = 0
+
+                    # The column names are known once the first rows have arrived
+                    rows = cursor.fetchmany(page_size)
+
+                    # Parquet transposes the row lists into columns as they are, the other file formats need dicts
+                    columns = [column[0] for column in cursor.description or []]
+                    as_dicts = output_format not in ("json", "parquet")
+
+                    # Save each batch on a writer thread while the cursor fetches the next one
+                    sink = batch_writer(self.output, output_format, columns=columns)
+                    progress = ProgressReporter(self.log, "rows")
+                    with progress, sink, BackgroundWriter(sink) as writer:
+                        while rows:
+                            if as_dicts:
+                                rows = [dict(zip(columns, row)) for row in rows]
 
-            while True:
-                row = cursor.fetchone()
-                if not row:
-                    break
+                            # Save the fetched rows to a file
+                            writer.save(rows)
 
-                # Save the fetched row to a file
-                self.output.save(row)
+                            # Update the number of processed rows
+                            processed_rows += len(rows)
+                            progress.add(len(rows))
+
+                            rows = cursor.fetchmany(page_size)
+
+                self.log.info(f"Total rows processed: {processed_rows}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
         except Exception as e:
             self.log.error(f"Error fetching data from Presto: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            conn.close()
+            update_state(self.state, self.id, success=False)
+
+    def _unload(
+        self, pool: ConnectionPool, table_name: str, projection: str, unload_catalog: str, unload_schema: str
+    ) -> int:
+        """
+        Write the table as Parquet files to the S3 folder of the output through a temporary external table.
+
+        Each unload writes to its own subfolder, named after the temporary table, so that it never mixes
+        its files with those of an earlier unload into the same output folder.
+
+        Args:
+            pool (ConnectionPool): The Presto connection pool.
+            table_name (str): The quoted, fully qualified name of the Presto table.
+            projection (str): The quoted columns to read, or "*".
+            unload_catalog (str): The Hive catalog to create the temporary export table in.
+            unload_schema (str): The schema to create the temporary export table in.
+
+        Returns:
+            int: The number of rows written.
+        """
+        export_name = f"export_{uuid.uuid4().hex}"
+        export_table = ".".join(_quote(name) for name in (unload_catalog, unload_schema, export_name))
+        location = f"s3a://{self.output.bucket}/{self.output.s3_folder}/{export_name}/"
+
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    f"CREATE TABLE {export_table} WITH (format = 'PARQUET', external_location = '{location}') "
+                    f"AS SELECT {projection} FROM {table_name}"
+                )
+                # The query runs until its single result row, the number of rows written, has been fetched
+                (processed_rows,) = cursor.fetchone()
+            finally:
+                # Dropping the external table keeps its Parquet files in place, also when the export failed midway
+                cursor.execute(f"DROP TABLE IF EXISTS {export_table}")
+                cursor.fetchall()
+
+        self.log.info(f"Total rows unloaded to {location}: {processed_rows}")
+        return processed_rows
+
+    def _fetch_partitions(
+        self,
+        pool: ConnectionPool,
+        table_name: str,
+        projection: str,
+        partition_column: str,
+        partitions: int,
+        page_size: int,
+        output_format: str,
+    ) -> int:
+        """
+        Split the table into equal ranges of the partition column and scan them in parallel.
+
+        Args:
+            pool (ConnectionPool): The Presto connection pool.
+            table_name (str): The quoted, fully qualified name of the Presto table.
+            projection (str): The quoted columns to read, or "*".
+            partition_column (str): The quoted numeric or date column to split on.
+            partitions (int): The number of ranges.
+            page_size (int): The number of rows to save per batch.
+            output_format (str): The output format, see `fetch`.
+
+        Returns:
+            int: The number of rows read from all ranges.
+        """
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT min({partition_column}), max({partition_column}) FROM {table_name}")
+            low, high = cursor.fetchone()
+
+        # Rows whose partition column is NULL fall in no range, so read them separately
+        ranges: List[Tuple[str, Tuple[Any, ...]]] = [
+            (f"SELECT {projection} FROM {table_name} WHERE {partition_column} IS NULL", ())
+        ]
+        if low is not None:
+            bounds = split_range(low, high, partitions)
+            for i, (start, stop) in enumerate(bounds):
+                # The last range includes its upper bound, the highest value
+                upper = "<=" if i == len(bounds) - 1 else "<"
+                condition = f"{partition_column} >= ? AND {partition_column} {upper} ?"
+                ranges.append((f"SELECT {projection} FROM {table_name} WHERE {condition}", (start, stop)))
+
+        # The ranges are saved on a single writer thread, as dicts in the file formats
+        as_dicts = output_format != "json"
+        progress = ProgressReporter(self.log, "rows")
+        with progress, batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                processed_rows = sum(
+                    executor.map(
+                        lambda r: self._scan_range(pool, r[0], r[1], page_size, as_dicts, writer, progress), ranges
+                    )
+                )
+
+        return processed_rows
+
+    def _scan_range(
+        self,
+        pool: ConnectionPool,
+        query: str,
+        params: Tuple[Any, ...],
+        page_size: int,
+        as_dicts: bool,
+        writer: BackgroundWriter,
+        progress: ProgressReporter,
+    ) -> int:
+        """
+        Scan a single range of the partition column and queue its rows to be saved.
+
+        Args:
+            pool (ConnectionPool): The Presto connection pool.
+            query (str): The SQL query of the range.
+            params (Tuple[Any, ...]): The bounds of the range.
+            page_size (int): The number of rows to save per batch.
+            as_dicts (bool): Whether to turn the row lists into dicts.
+            writer (BackgroundWriter): The writer to queue the batches to.
+            progress (ProgressReporter): The reporter to count the rows in.
+
+        Returns:
+            int: The number of rows read from the range.
+        """
+        processed_rows = 0
+
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = page_size
+            cursor.execute(query, params)
+
+            while rows := cursor.fetchmany(page_size):
+                if as_dicts:
+                    columns = [column[0] for column in cursor.description]
+                    rows = [dict(zip(columns, row)) for row in rows]
+
+                # Save the fetched rows to a file
+                writer.save(rows)
+
+                # Update the number of processed rows
+                processed_rows += len(rows)
+                progress.add(len(rows))
+
+        return processed_rows
@@ -16,6 +16,8 @@
 import redis  # type: ignore
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, ProgressReporter, batch_writer, batched, update_state
+
 
 class Redis(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -66,15 +68,26 @@ class Redis(Spout):
         port: int,
         password: str,
         database: int,
+        page_size: int = 5000,
+        scan_count: int = 10000,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from a Redis database and save it in batch.
 
+        Every key is saved with its value serialized by DUMP, which works for all value types, not only
+        strings, and can be restored with RESTORE.
+
         Args:
             host (str): The Redis host.
             port (int): The Redis port.
             password (str): The Redis password.
             database (int): The Redis database number.
+            page_size (int): The number of keys to read and save per batch. Defaults to 5000.
+            scan_count (int): The number of keys to ask each SCAN call to walk. Defaults to 10000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the keys and values into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the Redis server or execute the command.
@@ -91,37 +104,32 @@ class Redis(Spout):
             # Get the number of keys in the database
             count = connection.dbsize()
 
-            # Iterate through each key in the database
-            cursor = connection.scan_iter()
+            # Iterate through each key in the database, streaming the keys in batches as SCAN returns them
+            cursor = connection.scan_iter(count=scan_count)
             processed_rows = 0
 
-            while True:
-                # Get a batch of keys
-                batch = list(cursor)
-
-                # Check if there are any keys in the batch
-                if not batch:
-                    break
-
-                # Get the values for each key in the batch
-                values = connection.mget(batch)
-
-                # Save the batch of key-value pairs to a file
-                self.output.save(list(zip(batch, values)))
-
-                # Update the number of processed rows
-                processed_rows += len(batch)
-                self.log.info(f"Total rows processed: {processed_rows}/{count}")
+            # Save each batch on a writer thread while the next keys are scanned
+            progress = ProgressReporter(self.log, "rows")
+            with progress, batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                for batch in batched(cursor, page_size):
+                    # Dump the value of each key in the batch, whatever its type, in one round trip
+                    pipeline = connection.pipeline(transaction=False)
+                    for key in batch:
+                        pipeline.dump(key)
+                    values = pipeline.execute()
+
+                    # Save the batch of key-value pairs to a file, as dicts in the file formats
+                    if output_format == "json":
+                        writer.save(list(zip(batch, values)))
+                    else:
+                        writer.save([{"key": key, "value": value} for key, value in zip(batch, values)])
+
+                    # Update the number of processed rows
+                    processed_rows += len(batch)
+                    progress.add(len(batch))
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_rows"] = processed_rows
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
             self.log.info(f"Total rows processed: {processed_rows}/{count}")
@@ -130,13 +138,7 @@ class Redis(Spout):
             self.log.error(f"Error fetching data from Redis: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
 
         finally:
             # Close the Redis connection
@@ -13,9 +13,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+import itertools
+from contextlib import closing
+
 import riak
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, ProgressReporter, batch_writer, batched, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_client(host: str, port: int, concurrency: int) -> riak.RiakClient:
+    client = riak.RiakClient(protocol="pbc", nodes=[{"host": host, "pb_port": port}], multiget_pool_size=concurrency)
+    atexit.register(client.close)
+    return client
+
 
 class Riak(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -35,7 +49,7 @@ class Riak(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args host=localhost port=8098
+                --args host=localhost port=8087 bucket=mybucket
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -47,7 +61,8 @@ class Riak(Spout):
                 method: "fetch"
                 args:
                     host: "localhost"
-                    port: 8098
+                    port: 8087
+                    bucket: "mybucket"
                 output:
                     type: "batch"
                     args:
@@ -62,66 +77,66 @@ class Riak(Spout):
         self,
         host: str,
         port: int,
+        bucket: str,
+        page_size: int = 500,
+        concurrency: int = 64,
+        output_format: str = "json",
     ):
         """
         📖 Fetch data from a Riak database and save it in batch.
 
         Args:
             host (str): The Riak host.
-            port (int): The Riak port.
+            port (int): The Riak protocol buffers port, usually 8087.
+            bucket (str): The name of the Riak bucket.
+            page_size (int): The number of objects to save per batch. Defaults to 500.
+            concurrency (int): The number of objects of a batch fetched at once. Defaults to 64.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the objects into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the Riak server or execute the query.
         """
-        # Initialize Riak client
-        client = riak.RiakClient(host=host, port=port)
+        # Reuse the Riak connection pool across fetches
+        client = _get_client(host, port, concurrency)
 
         try:
-            # Connect to the database
-            with client as bucket:
-                # Get the number of objects in the database
-                count = len(list(bucket.get_bucket().keys()))
-
-                # Iterate through each object in the database
-                cursor = bucket.get_bucket().get_keys()
-                processed_objects = 0
-
-                while True:
-                    # Get a batch of objects
-                    batch = list(cursor.batch_size(100))
-
-                    # Check if there are any objects in the batch
-                    if not batch:
-                        break
-
-                    # Save the batch of objects to a file
-                    self.output.save(batch)
-
-                    # Update the number of processed objects
-                    processed_objects += len(batch)
-                    self.log.info(f"Total objects processed: {processed_objects}/{count}")
-
-                # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_objects": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_objects"] = processed_objects
-                self.state.set_state(self.id, current_state)
+            # Stream the keys of the bucket as the nodes list them, in a single pass
+            objects = client.bucket(bucket)
+            processed_objects = 0
+
+            # Save each batch on a writer thread while the next one is read
+            progress = ProgressReporter(self.log, "objects")
+            with closing(objects.stream_keys()) as keys:
+                with progress, batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+                    for batch in batched(itertools.chain.from_iterable(keys), page_size):
+                        # Get the objects of the batch of keys, in parallel on the pooled connections
+                        results = objects.multiget(batch)
+
+                        # Keys that could not be read come back as (bucket_type, bucket, key, exception) tuples
+                        for result in results:
+                            if isinstance(result, tuple):
+                                _, _, key, error = result
+                                raise Exception(f"Unable to fetch Riak key {key!r}: {error}") from error
+
+                        batch = [{"key": obj.key, "value": obj.data} for obj in results]
+
+                        # Save the batch of objects to a file
+                        writer.save(batch)
+
+                        # Update the number of processed objects
+                        processed_objects += len(batch)
+                        progress.add(len(batch))
+
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_objects=processed_objects)
 
             # Log the total number of objects processed
-            self.log.info(f"Total objects processed: {processed_objects}/{count}")
+            self.log.info(f"Total objects processed: {processed_objects}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Riak: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_objects": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
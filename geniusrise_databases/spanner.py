@@ -13,8 +13,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import atexit
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
 import google.cloud.spanner
 from geniusrise import BatchOutput, Spout, State
+from google.cloud.spanner_v1.database import BatchSnapshot, Database
+
+from geniusrise_databases.utils import BackgroundWriter, ProgressReporter, batched, gather_bounded, update_state
+
+
+@functools.lru_cache(maxsize=16)
+def _get_database(project_id: str, instance_id: str, database_id: str) -> Database:
+    client = google.cloud.spanner.Client(project=project_id)
+    atexit.register(client.close)
+    return client.instance(instance_id).database(database_id)
+
+
+def _quote(identifier: str) -> str:
+    return "`" + identifier.replace("\\", "\\\\").replace("`", "\\`") + "`"
+
+
+def _count_rows(database: Database, table_id: str) -> int:
+    with database.snapshot() as snapshot:
+        (row_count,) = next(iter(snapshot.execute_sql(f"SELECT COUNT(*) FROM {_quote(table_id)}")))
+    return row_count
 
 
 class Spanner(Spout):
@@ -35,7 +62,7 @@ class Spanner(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --project_id my_project_id instance_id=my_instance database_id=my_database table_id=my_table
+                --args project_id=my_project_id instance_id=my_instance database_id=my_database table_id=my_table
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -60,33 +87,189 @@ class Spanner(Spout):
         super().__init__(output, state)
         self.top_level_arguments = kwargs
 
-    def fetch(self, project_id: str, instance_id: str, database_id: str, table_id: str):
+    def fetch(
+        self,
+        project_id: str,
+        instance_id: str,
+        database_id: str,
+        table_id: str,
+        page_size: int = 1000,
+        max_partitions: int = 16,
+        compute_counts: bool = False,
+        columns: Optional[List[str]] = None,
+    ):
         """
         📖 Fetch data from a Spanner database and save it in batch.
 
+        The table is read from a batch snapshot, split by Spanner into partitions that are read in parallel.
+
+        Args:
+            project_id (str): The Google Cloud project ID.
+            instance_id (str): The Spanner instance ID.
+            database_id (str): The Spanner database ID.
+            table_id (str): The Spanner table ID.
+            page_size (int): The number of rows to save per batch. Defaults to 1000.
+            max_partitions (int): The maximum number of partitions to split the query into. Defaults to 16.
+            compute_counts (bool): Whether to count the rows up front to log the total. Defaults to False.
+            columns (Optional[List[str]]): The columns to read, so that the other columns are never sent
+                over. Defaults to all columns.
+
+        Raises:
+            Exception: If unable to connect to the Spanner database or execute the query.
+        """
+        # Reuse the Spanner client and its sessions across fetches
+        database = _get_database(project_id, instance_id, database_id)
+
+        # Perform the Spanner operation
+        try:
+            # Count the rows in a separate read-only snapshot, only when the total is logged
+            total = ""
+            if compute_counts and self.log.isEnabledFor(logging.INFO):
+                total = f"/{_count_rows(database, table_id)}"
+
+            # Quote the identifiers, so that names given on the command line can't inject SQL
+            projection = ", ".join(map(_quote, columns)) if columns else "*"
+            query = f"SELECT {projection} FROM {_quote(table_id)}"
+
+            snapshot = database.batch_snapshot()
+            try:
+                # Let Spanner split the scan along its splits, so that the partitions are read from many servers
+                partitions = list(snapshot.generate_query_batches(query, max_partitions=max_partitions))
+
+                # Save each partition on a writer thread while the others are still being read
+                progress = ProgressReporter(self.log, "rows")
+                with progress, BackgroundWriter(self.output) as writer:
+                    with ThreadPoolExecutor(max_workers=max(1, len(partitions))) as executor:
+                        processed_rows = sum(
+                            executor.map(
+                                lambda p: self._read_partition(snapshot, p, page_size, writer, progress), partitions
+                            )
+                        )
+            finally:
+                snapshot.close()
+
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+            # Log the total number of rows processed
+            self.log.info(f"Total rows processed: {processed_rows}{total}")
+
+        except Exception as e:
+            self.log.error(f"Error fetching data from Spanner: {e}")
+
+            # Update the state
+            update_state(self.state, self.id, success=False)
+
+    async def fetch_async(
+        self,
+        project_id: str,
+        instance_id: str,
+        database_id: str,
+        table_id: str,
+        page_size: int = 1000,
+        max_partitions: int = 16,
+        concurrency: int = 16,
+        compute_counts: bool = False,
+        columns: Optional[List[str]] = None,
+    ) -> None:
+        """
+        📖 Fetch data from a Spanner database on the running event loop and save it in batch.
+
+        The partitions of the batch snapshot are read on worker threads, at most `concurrency` at once, so
+        that the event loop stays free for other fetches while they wait on Spanner.
+
         Args:
             project_id (str): The Google Cloud project ID.
             instance_id (str): The Spanner instance ID.
             database_id (str): The Spanner database ID.
             table_id (str): The Spanner table ID.
+            page_size (int): The number of rows to save per batch. Defaults to 1000.
+            max_partitions (int): The maximum number of partitions to split the query into. Defaults to 16.
+            concurrency (int): The maximum number of partitions read at once. Defaults to 16.
+            compute_counts (bool): Whether to count the rows up front to log the total. Defaults to False.
+            columns (Optional[List[str]]): The columns to read, so that the other columns are never sent
+                over. Defaults to all columns.
 
         Raises:
             Exception: If unable to connect to the Spanner database or execute the query.
         """
-        # Initialize Spanner client
-        client = google.cloud.spanner.Client(project=project_id)
+        # Reuse the Spanner client and its sessions across fetches
+        database = _get_database(project_id, instance_id, database_id)
+
+        # Perform the Spanner operation
+        try:
+            # Count the rows in a separate read-only snapshot, only when the total is logged
+            total = ""
+            if compute_counts and self.log.isEnabledFor(logging.INFO):
+                total = f"/{await asyncio.to_thread(_count_rows, database, table_id)}"
+
+            # Quote the identifiers, so that names given on the command line can't inject SQL
+            projection = ", ".join(map(_quote, columns)) if columns else "*"
+            query = f"SELECT {projection} FROM {_quote(table_id)}"
+
+            snapshot = database.batch_snapshot()
+            try:
+                # Let Spanner split the scan along its splits, so that the partitions are read from many servers
+                partitions = await asyncio.to_thread(
+                    lambda: list(snapshot.generate_query_batches(query, max_partitions=max_partitions))
+                )
+
+                # Save each partition on a writer thread while the others are still being read
+                progress = ProgressReporter(self.log, "rows")
+                with progress, BackgroundWriter(self.output) as writer:
+                    processed_rows = sum(
+                        await gather_bounded(
+                            (
+                                asyncio.to_thread(self._read_partition, snapshot, p, page_size, writer, progress)
+                                for p in partitions
+                            ),
+                            concurrency,
+                        )
+                    )
+            finally:
+                snapshot.close()
 
-        # Execute the query and save the results to a file
-        with client.session(database=database_id) as session:
-            results = session.execute(f"SELECT * FROM {table_id}")
-            self.output.save(results)
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+            # Log the total number of rows processed
+            self.log.info(f"Total rows processed: {processed_rows}{total}")
+
+        except Exception as e:
+            self.log.error(f"Error fetching data from Spanner: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_rows"] = len(results)
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _read_partition(
+        self,
+        snapshot: BatchSnapshot,
+        partition: Dict[str, Any],
+        page_size: int,
+        writer: BackgroundWriter,
+        progress: ProgressReporter,
+    ) -> int:
+        """
+        Read a single partition of the query and queue its rows to be saved.
+
+        Args:
+            snapshot (BatchSnapshot): The batch snapshot the partitions were generated from.
+            partition (Dict[str, Any]): The partition to read.
+            page_size (int): The number of rows to save per batch.
+            writer (BackgroundWriter): The writer to queue the batches to.
+            progress (ProgressReporter): The reporter to count the rows in.
+
+        Returns:
+            int: The number of rows read from the partition.
+        """
+        processed_rows = 0
+
+        for rows in batched(snapshot.process_query_batch(partition), page_size):
+            # Save the fetched rows to a file
+            writer.save(rows)
+
+            # Update the number of processed rows
+            processed_rows += len(rows)
+            progress.add(len(rows))
+
+        return processed_rows
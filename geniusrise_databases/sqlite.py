@@ -13,13 +13,196 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
+import functools
+import hashlib
 import os
-import sqlite3
-from typing import Any, Dict
+import shutil
+import tempfile
+from typing import Any, List, Union
 
+import apsw
 import boto3
+from botocore.exceptions import ClientError
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, ProgressReporter, batch_writer, batched, update_state
+
+# Size of the byte ranges read from S3, each read serves many SQLite pages
+BLOCK_SIZE = 4 << 20
+
+# Directory of the blocks read from S3, kept across fetches for as long as the object does not change, in a
+# directory per object holding one directory per ETag
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "geniusrise_databases", "sqlite")
+
+# Maximum size of the blocks kept in CACHE_DIR, beyond which the least recently used ones are removed
+CACHE_SIZE = 1 << 30
+
+
+def _evict_blocks(limit: int) -> None:
+    # Remove the least recently used blocks of all objects until the cache fits in `limit` bytes
+    blocks = []
+    for root, _, names in os.walk(CACHE_DIR):
+        for name in names:
+            # Skip the temporary files of blocks still being written
+            if not name.isdigit():
+                continue
+            path = os.path.join(root, name)
+            with contextlib.suppress(FileNotFoundError):
+                stat = os.stat(path)
+                blocks.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in blocks)
+    for _, size, path in sorted(blocks):
+        if total <= limit:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        total -= size
+
+
+class _S3File:
+    """
+    A read-only SQLite file backed by ranged GETs of an S3 object, with the last blocks read kept in memory.
+
+    Blocks are also cached on disk under the ETag of the object, so that fetching the same unchanged
+    database again reads them locally. The blocks of other versions of the object are removed when it
+    is opened, and the least recently used blocks once the cache outgrows CACHE_SIZE. Blocks are only
+    read from S3 while the object still has the ETag it was opened with, so a database replaced midway
+    fails the fetch instead of mixing pages of two versions.
+    """
+
+    def __init__(self, client: Any, bucket: str, key: str, cached_blocks: int = 16) -> None:
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        head = client.head_object(Bucket=bucket, Key=key)
+        self._size = head["ContentLength"]
+        self._etag = head["ETag"]
+        object_dir = os.path.join(CACHE_DIR, hashlib.sha1(f"{bucket}/{key}".encode()).hexdigest())
+        etag = hashlib.sha1(head["ETag"].encode()).hexdigest()
+        self._cache_dir = os.path.join(object_dir, etag)
+
+        # Drop the cached blocks of the previous versions of the object
+        if os.path.isdir(object_dir):
+            for entry in os.listdir(object_dir):
+                if entry != etag:
+                    shutil.rmtree(os.path.join(object_dir, entry), ignore_errors=True)
+
+        self._block = functools.lru_cache(maxsize=cached_blocks)(self._read_block)
+
+    def _read_block(self, index: int) -> bytes:
+        path = os.path.join(self._cache_dir, str(index))
+        try:
+            with open(path, "rb") as cached:
+                data = cached.read()
+            # Mark the block as recently used for the eviction
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            pass
+
+        start = index * BLOCK_SIZE
+        end = min(start + BLOCK_SIZE, self._size) - 1
+        try:
+            response = self._client.get_object(
+                Bucket=self._bucket, Key=self._key, Range=f"bytes={start}-{end}", IfMatch=self._etag
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "PreconditionFailed":
+                raise apsw.IOError(f"s3://{self._bucket}/{self._key} changed while it was read") from e
+            raise
+        data = response["Body"].read()
+
+        # Write the block under a temporary name first, so that a partial block is never read back
+        os.makedirs(self._cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self._cache_dir, delete=False) as temporary:
+            temporary.write(data)
+        os.replace(temporary.name, path)
+        _evict_blocks(CACHE_SIZE)
+        return data
+
+    def xRead(self, amount: int, offset: int) -> bytes:  # noqa: N802
+        end = min(offset + amount, self._size)
+        if end <= offset:
+            return b""
+
+        first, last = offset // BLOCK_SIZE, (end - 1) // BLOCK_SIZE
+        data = b"".join(self._block(index) for index in range(first, last + 1))
+        start = offset - first * BLOCK_SIZE
+        return data[start : start + end - offset]
+
+    def xFileSize(self) -> int:  # noqa: N802
+        return self._size
+
+    def xWrite(self, data: bytes, offset: int) -> None:  # noqa: N802
+        raise apsw.ReadOnlyError()
+
+    def xTruncate(self, newsize: int) -> None:  # noqa: N802
+        raise apsw.ReadOnlyError()
+
+    def xSync(self, flags: int) -> None:  # noqa: N802
+        pass
+
+    def xLock(self, level: int) -> None:  # noqa: N802
+        pass
+
+    def xUnlock(self, level: int) -> None:  # noqa: N802
+        pass
+
+    def xCheckReservedLock(self) -> bool:  # noqa: N802
+        return False
+
+    def xFileControl(self, op: int, ptr: int) -> bool:  # noqa: N802
+        return False
+
+    def xSectorSize(self) -> int:  # noqa: N802
+        return 0
+
+    def xDeviceCharacteristics(self) -> int:  # noqa: N802
+        return 0
+
+    def xClose(self) -> None:  # noqa: N802
+        self._block.cache_clear()
+
+
+class _S3VFS(apsw.VFS):
+    """
+    A read-only SQLite VFS that opens "bucket/key" names as S3 objects, reading only the pages a query touches.
+    """
+
+    def __init__(self, name: str = "s3") -> None:
+        self.name = name
+        self._client = boto3.client("s3")
+        super().__init__(name, "")
+
+    def xOpen(self, name: Union[str, apsw.URIFilename, None], flags: List[int]) -> apsw.VFSFile:  # noqa: N802
+        # SQLite asks for nameless temporary files, which have no S3 object, with a None name
+        if name is None:
+            raise apsw.CantOpenError("Temporary files are not supported on S3")
+
+        path = name if isinstance(name, str) else name.filename()
+        bucket, key = path.split("/", 1)
+        flags[1] = apsw.SQLITE_OPEN_READONLY
+
+        # apsw takes any object with the methods of a VFSFile
+        return _S3File(self._client, bucket, key)  # type: ignore[return-value]
+
+    def xAccess(self, pathname: str, flags: int) -> bool:  # noqa: N802
+        # There are never journal or WAL files next to the database
+        return False
+
+    def xFullPathname(self, name: str) -> str:  # noqa: N802
+        return name
+
+    def xDelete(self, filename: str, syncdir: bool) -> None:  # noqa: N802
+        raise apsw.ReadOnlyError()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_vfs() -> _S3VFS:
+    return _S3VFS()
+
 
 class SQLite(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs: Any) -> None:
@@ -64,7 +247,14 @@ class SQLite(Spout):
         super().__init__(output, state)
         self.top_level_arguments = kwargs
 
-    def fetch(self, s3_bucket: str, s3_key: str, query: str, page_size: int = 100) -> None:
+    def fetch(
+        self,
+        s3_bucket: str,
+        s3_key: str,
+        query: str,
+        page_size: int = 1000,
+        output_format: str = "json",
+    ) -> None:
         """
         📖 Fetch data from an SQLite database and save it in batch.
 
@@ -72,62 +262,62 @@ class SQLite(Spout):
             s3_bucket (str): The S3 bucket containing the SQLite database.
             s3_key (str): The S3 key for the SQLite database.
             query (str): The SQL query to execute.
-            page_size (int): The number of rows to fetch per page. Defaults to 100.
+            page_size (int): The number of rows to fetch per page. Defaults to 1000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the SQLite database or execute the query.
         """
-        # Download SQLite database from S3
-        local_path = f"/tmp/{os.path.basename(s3_key)}"
-        s3 = boto3.client("s3")
-        s3.download_file(s3_bucket, s3_key, local_path)
-
-        # Initialize SQLite connection
-        connection = sqlite3.connect(local_path)
-        connection.row_factory = sqlite3.Row  # To get dict-like rows
+        # Open the SQLite database in place on S3, reading its pages with ranged GETs as the query needs them
+        connection = apsw.Connection(f"{s3_bucket}/{s3_key}", flags=apsw.SQLITE_OPEN_READONLY, vfs=_get_vfs().name)
 
         try:
             cursor = connection.cursor()
-            cursor.execute(query)
+
+            # Keep up to 256 MiB of pages in memory, so that pages read from S3 are not read again, and
+            # never write, not even temporary tables to disk
+            cursor.execute("PRAGMA cache_size = -262144")
+            cursor.execute("PRAGMA temp_store = MEMORY")
+            cursor.execute("PRAGMA query_only = ON")
+
+            results = cursor.execute(query)
             processed_rows = 0
 
-            while True:
-                rows = cursor.fetchmany(page_size)
-                if not rows:
-                    break
+            # Look up the column names once, before the statement runs to completion
+            try:
+                columns = [column[0] for column in cursor.getdescription()]
+            except apsw.ExecutionCompleteError:
+                columns = []
+
+            # Save each batch on a writer thread while the next pages are read, the row tuples are saved as
+            # they are and Parquet transposes them into columns, the other file formats need dicts
+            as_dicts = output_format not in ("json", "parquet")
+            sink = batch_writer(self.output, output_format, columns=columns)
+            progress = ProgressReporter(self.log, "rows")
+            with progress, sink, BackgroundWriter(sink) as writer:
+                for rows in batched(results, page_size):
+                    if as_dicts:
+                        rows = [dict(zip(columns, row)) for row in rows]
 
-                # Convert rows to dictionaries
-                rows = [dict(row) for row in rows]
+                    # Save the fetched rows to a file
+                    writer.save(rows)
 
-                # Save the fetched rows to a file
-                self.output.save(rows)
+                    # Update the number of processed rows
+                    processed_rows += len(rows)
+                    progress.add(len(rows))
 
-                # Update the number of processed rows
-                processed_rows += len(rows)
-                self.log.info(f"Processed rows: {processed_rows}")
+            self.log.info(f"Total rows processed: {processed_rows}")
 
             # Update the state
-            current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_rows"] = processed_rows
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
         except Exception as e:
             self.log.error(f"Error fetching data from SQLite: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
 
         finally:
             connection.close()
-            os.remove(local_path)  # Remove the downloaded SQLite database
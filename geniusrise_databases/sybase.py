@@ -13,9 +13,37 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
+
 import pymssql
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import (
+    BackgroundWriter,
+    ConnectionPool,
+    ProgressReporter,
+    as_subquery,
+    batch_writer,
+    split_range,
+    update_state,
+)
+
+
+def _quote(identifier: str) -> str:
+    return "[" + identifier.replace("]", "]]") + "]"
+
+
+@functools.lru_cache(maxsize=16)
+def _get_pool(host: str, port: int, user: str, password: str, database: str) -> ConnectionPool:
+    pool = ConnectionPool(
+        functools.partial(pymssql.connect, server=host, port=port, user=user, password=password, database=database)
+    )
+    atexit.register(pool.close)
+    return pool
+
 
 class Sybase(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -71,7 +99,10 @@ class Sybase(Spout):
         password: str,
         database: str,
         query: str,
-        page_size: int = 100,
+        page_size: int = 1000,
+        output_format: str = "json",
+        partition_column: Optional[str] = None,
+        partitions: int = 1,
     ):
         """
         📖 Fetch data from a Sybase database and save it in batch.
@@ -83,56 +114,180 @@ class Sybase(Spout):
             password (str): The Sybase password.
             database (str): The Sybase database name.
             query (str): The SQL query to execute.
-            page_size (int): The number of rows to fetch per page. Defaults to 100.
+            page_size (int): The number of rows to fetch per page. Defaults to 1000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
+            partition_column (Optional[str]): A numeric or date column of the query results to split the query
+                on, so that its ranges are read in parallel. The query is then run as a subquery, so it can't
+                start with common table expressions or end with an ORDER BY. Defaults to None.
+            partitions (int): The number of ranges to split the query into, at most 10 run at once.
+                Defaults to 1.
 
         Raises:
             Exception: If unable to connect to the Sybase server or execute the query.
         """
-        # Initialize Sybase connection
-        connection = pymssql.connect(server=host, port=port, user=user, password=password, database=database)
+        # Reuse the pooled Sybase connections across fetches
+        pool = _get_pool(host, port, user, password, database)
 
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(query)
-                total_rows = cursor.rowcount
-                processed_rows = 0
+            if partition_column and partitions > 1:
+                # Scan ranges of the partition column in parallel, each on its own pooled connection
+                processed_rows = self._fetch_partitions(
+                    pool, query, _quote(partition_column), partitions, page_size, output_format
+                )
+            else:
+                processed_rows = self._fetch_query(pool, query, page_size, output_format)
 
-                while True:
-                    rows = cursor.fetchmany(page_size)
-                    if not rows:
-                        break
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+            # Log the total number of rows processed
+            self.log.info(f"Total rows processed: {processed_rows}")
+
+        except Exception as e:
+            self.log.error(f"Error fetching data from Sybase: {e}")
+
+            # Update the state
+            update_state(self.state, self.id, success=False)
+
+    def _fetch_query(self, pool: ConnectionPool, query: str, page_size: int, output_format: str) -> int:
+        """
+        Run the query on a single cursor and save its rows in batch.
+
+        Args:
+            pool (ConnectionPool): The Sybase connection pool.
+            query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per round trip and save per batch.
+            output_format (str): The output format, see `fetch`.
+
+        Returns:
+            int: The number of rows read.
+        """
+        with pool.connection() as connection, connection.cursor() as cursor:
+            cursor.arraysize = page_size
+            cursor.execute(query)
+            processed_rows = 0
+
+            # Parquet transposes the row tuples into columns as they are, the other file formats need dicts
+            columns = [column[0] for column in cursor.description]
+            as_dicts = output_format not in ("json", "parquet")
+
+            # Save each batch on a writer thread while the cursor fetches the next one
+            sink = batch_writer(self.output, output_format, columns=columns)
+            progress = ProgressReporter(self.log, "rows")
+            with progress, sink, BackgroundWriter(sink) as writer:
+                while rows := cursor.fetchmany(page_size):
+                    if as_dicts:
+                        rows = [dict(zip(columns, row)) for row in rows]
 
                     # Save the fetched rows to a file
-                    self.output.save(rows)
+                    writer.save(rows)
 
                     # Update the number of processed rows
                     processed_rows += len(rows)
-                    self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
-
-                # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = processed_rows
-                self.state.set_state(self.id, current_state)
+                    progress.add(len(rows))
 
-            # Log the total number of rows processed
-            self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
+        return processed_rows
 
-        except Exception as e:
-            self.log.error(f"Error fetching data from Sybase: {e}")
+    def _fetch_partitions(
+        self,
+        pool: ConnectionPool,
+        query: str,
+        partition_column: str,
+        partitions: int,
+        page_size: int,
+        output_format: str,
+    ) -> int:
+        """
+        Split the query into equal ranges of the partition column and scan them in parallel.
 
-            # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            connection.close()
+        Args:
+            pool (ConnectionPool): The Sybase connection pool.
+            query (str): The SQL query to execute.
+            partition_column (str): The quoted numeric or date column of the query results to split on.
+            partitions (int): The number of ranges.
+            page_size (int): The number of rows to fetch per round trip and save per batch.
+            output_format (str): The output format, see `fetch`.
+
+        Returns:
+            int: The number of rows read from all ranges.
+        """
+        subquery = as_subquery(query)
+        with pool.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(f"SELECT MIN({partition_column}), MAX({partition_column}) FROM {subquery}")
+            low, high = cursor.fetchone()
+
+        # Rows whose partition column is NULL fall in no range, so read them separately
+        ranges: List[Tuple[str, Tuple[Any, ...]]] = [(f"SELECT * FROM {subquery} WHERE {partition_column} IS NULL", ())]
+        if low is not None:
+            bounds = split_range(low, high, partitions)
+            for i, (start, stop) in enumerate(bounds):
+                # The last range includes its upper bound, the highest value
+                upper = "<=" if i == len(bounds) - 1 else "<"
+                condition = f"{partition_column} >= %s AND {partition_column} {upper} %s"
+
+                # The bounds are bound as %s parameters, so a literal % of the query, as in LIKE 'a%', is doubled
+                ranges.append((f"SELECT * FROM {subquery.replace('%', '%%')} WHERE {condition}", (start, stop)))
+
+        # The ranges are saved on a single writer thread, as dicts in the file formats
+        as_dicts = output_format != "json"
+        progress = ProgressReporter(self.log, "rows")
+        with progress, batch_writer(self.output, output_format) as sink, BackgroundWriter(sink) as writer:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                processed_rows = sum(
+                    executor.map(
+                        lambda r: self._scan_range(pool, r[0], r[1], page_size, as_dicts, writer, progress), ranges
+                    )
+                )
+
+        return processed_rows
+
+    def _scan_range(
+        self,
+        pool: ConnectionPool,
+        query: str,
+        params: Tuple[Any, ...],
+        page_size: int,
+        as_dicts: bool,
+        writer: BackgroundWriter,
+        progress: ProgressReporter,
+    ) -> int:
+        """
+        Scan a single range of the partition column and queue its rows to be saved.
+
+        Args:
+            pool (ConnectionPool): The Sybase connection pool.
+            query (str): The SQL query of the range.
+            params (Tuple[Any, ...]): The bounds of the range, or none to run the query as it is.
+            page_size (int): The number of rows to fetch per round trip and save per batch.
+            as_dicts (bool): Whether to turn the row tuples into dicts.
+            writer (BackgroundWriter): The writer to queue the batches to.
+            progress (ProgressReporter): The reporter to count the rows in.
+
+        Returns:
+            int: The number of rows read from the range.
+        """
+        processed_rows = 0
+
+        with pool.connection() as connection, connection.cursor() as cursor:
+            cursor.arraysize = page_size
+            if params:
+                cursor.execute(query, params)
+            else:
+                # Without parameters, the % of the query are not escaped and must not be formatted
+                cursor.execute(query)
+            columns = [column[0] for column in cursor.description]
+
+            while rows := cursor.fetchmany(page_size):
+                if as_dicts:
+                    rows = [dict(zip(columns, row)) for row in rows]
+
+                # Save the fetched rows to a file
+                writer.save(rows)
+
+                # Update the number of processed rows
+                processed_rows += len(rows)
+                progress.add(len(rows))
+
+        return processed_rows
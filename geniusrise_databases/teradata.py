@@ -13,9 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import threading
+from typing import Any, Callable, List, Optional
+
 import pyteradata
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import BackgroundWriter, BatchSaver, map_threads, select_columns, update_state
+
 
 class Teradata(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -35,7 +41,7 @@ class Teradata(Spout):
                 --output_s3_folder s3/folder \
             none \
             fetch \
-                --args host=myteradata.example.com username=myusername password=mypassword database=mydb
+                --args host=myteradata.example.com username=myusername password=mypassword database=mydb query="SELECT * FROM mytable"
         ```
 
         ## Using geniusrise to invoke via YAML file
@@ -50,6 +56,7 @@ class Teradata(Spout):
                     username: "myusername"
                     password: "mypassword"
                     database: "mydb"
+                    query: "SELECT * FROM mytable"
                 output:
                     type: "batch"
                     args:
@@ -66,6 +73,12 @@ class Teradata(Spout):
         username: str,
         password: str,
         database: str,
+        query: str,
+        page_size: int = 1000,
+        columns: Optional[List[str]] = None,
+        flush_rows: int = 100000,
+        partition_column: Optional[str] = None,
+        parallelism: int = 1,
     ):
         """
         📖 Fetch data from a Teradata database and save it in batch.
@@ -75,49 +88,96 @@ class Teradata(Spout):
             username (str): The Teradata username.
             password (str): The Teradata password.
             database (str): The Teradata database name.
+            query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per round trip. Defaults to 1000.
+            columns (Optional[List[str]]): The columns to select in place of a leading `SELECT *` of the query,
+                so that the other columns of wide tables are never read or sent over. Defaults to None.
+            flush_rows (int): The number of rows to collect into each saved batch, so that fewer and larger
+                batches are written. Defaults to 100000.
+            partition_column (Optional[str]): A column of the query to hash into `parallelism` disjoint shards
+                that are scanned in parallel, each on its own connection. Defaults to None.
+            parallelism (int): The number of shards to split the scan into. Defaults to 1.
 
         Raises:
             Exception: If unable to connect to the Teradata server or execute the command.
         """
-        # Initialize the Teradata connection
-        try:
-            conn = pyteradata.connect(host=host, username=username, password=password)
-            conn.database = database
-        except Exception as e:
-            self.log.error(f"Error connecting to Teradata server: {e}")
-            return
-
         # Perform the Teradata operation
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM mytable")
-
-            while True:
-                row = cursor.fetchone()
-                if not row:
-                    break
-
-                # Save the fetched row to a file
-                self.output.save(row)
+            query = select_columns(query, columns)
+            if partition_column and parallelism > 1:
+                # Split the query into disjoint hash shards of the partition column, scanned in parallel
+                bucket = f"HASHBUCKET(HASHROW({partition_column})) MOD {parallelism}"
+                shards = [f"SELECT * FROM ({query}) AS sub WHERE {bucket} = {shard}" for shard in range(parallelism)]
+            else:
+                shards = [query]
+
+            # Save the batches of all shards on a single writer thread while the cursors fetch on
+            connect = functools.partial(pyteradata.connect, host=host, username=username, password=password)
+            with BackgroundWriter(self.output) as writer:
+                stop = threading.Event()
+                processed_rows = sum(
+                    map_threads(
+                        lambda shard: self._scan(connect, database, shard, page_size, flush_rows, writer, stop),
+                        shards,
+                        stop,
+                    )
+                )
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["success_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+            # Log the total number of rows processed
+            self.log.info(f"Total rows processed: {processed_rows}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Teradata: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
+
+    def _scan(
+        self,
+        connect: Callable[[], Any],
+        database: str,
+        query: str,
+        page_size: int,
+        flush_rows: int,
+        writer: BackgroundWriter,
+        stop: threading.Event,
+    ) -> int:
+        """
+        Run a query on its own connection and queue its rows to be saved.
+
+        Args:
+            connect (Callable[[], Any]): Opens a new Teradata connection.
+            database (str): The Teradata database name.
+            query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per round trip.
+            flush_rows (int): The number of rows to collect into each saved batch.
+            writer (BackgroundWriter): The writer to queue the batches to.
+            stop (threading.Event): Set when another worker failed, to return without reading the rest.
+
+        Returns:
+            int: The number of rows read.
+        """
+        processed_rows = 0
 
+        conn = connect()
+        try:
+            conn.database = database
+            cursor = conn.cursor()
+            cursor.arraysize = page_size
+            cursor.execute(query)
+
+            # Collect the pages into larger batches
+            with BatchSaver(writer, flush_rows) as saver:
+                while not stop.is_set() and (rows := cursor.fetchmany(page_size)):
+                    # Save the fetched rows to a file
+                    saver.extend(rows)
+
+                    # Update the number of processed rows
+                    processed_rows += len(rows)
         finally:
             conn.close()
+
+        return processed_rows
@@ -13,11 +13,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict
+import atexit
+import functools
+from typing import Any, List, Optional
 
 import pymysql  # type: ignore
 from geniusrise import BatchOutput, Spout, State
-from pymysql.cursors import DictCursor  # type: ignore
+from pymysql.cursors import SSCursor  # type: ignore
+
+from geniusrise_databases.utils import (
+    BackgroundWriter,
+    BatchSaver,
+    ConnectionPool,
+    ProgressReporter,
+    batch_writer,
+    select_columns,
+    update_state,
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_pool(host: str, port: int, user: str, password: str, database: str) -> ConnectionPool:
+    # Autocommit, so that a pooled connection never reads from the snapshot of a previous fetch
+    pool = ConnectionPool(
+        functools.partial(
+            pymysql.connect,
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            database=database,
+            cursorclass=SSCursor,
+            autocommit=True,
+        )
+    )
+    atexit.register(pool.close)
+    return pool
 
 
 class TiDB(Spout):
@@ -74,7 +105,10 @@ class TiDB(Spout):
         password: str,
         database: str,
         query: str,
-        page_size: int = 100,
+        page_size: int = 1000,
+        columns: Optional[List[str]] = None,
+        flush_rows: int = 100000,
+        output_format: str = "json",
     ) -> None:
         """
         📖 Fetch data from a TiDB database and save it in batch.
@@ -86,63 +120,61 @@ class TiDB(Spout):
             password (str): The TiDB password.
             database (str): The TiDB database name.
             query (str): The SQL query to execute.
-            page_size (int): The number of rows to fetch per page. Defaults to 100.
+            page_size (int): The number of rows to fetch per page. Defaults to 1000.
+            columns (Optional[List[str]]): The columns to select in place of a leading `SELECT *` of the query,
+                so that the other columns of wide tables are never read or sent over. Defaults to None.
+            flush_rows (int): The number of rows to collect into each saved batch, so that fewer and larger
+                batches are written. Defaults to 100000.
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the TiDB server or execute the query.
         """
-        # Initialize TiDB connection
-        connection = pymysql.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            cursorclass=DictCursor,
-        )
+        # Reuse the pooled TiDB connections across fetches
+        pool = _get_pool(host, port, user, password, database)
 
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(query)
-                total_rows = cursor.rowcount
+            with pool.connection() as connection, connection.cursor() as cursor:
+                cursor.arraysize = page_size
+                cursor.execute(select_columns(query, columns, quote="`"))
                 processed_rows = 0
 
-                while True:
-                    rows = cursor.fetchmany(page_size)
-                    if not rows:
-                        break
+                # Stream the rows unbuffered as tuples, and build their dicts from the column names looked up once
+                columns = [column[0] for column in cursor.description]
+
+                # Parquet transposes the row tuples into columns as they are, the other formats need dicts
+                as_dicts = output_format != "parquet"
+
+                # Collect the pages into larger batches, saved on a writer thread while the cursor fetches on, the
+                # compressed file formats are encoded and compressed on that thread too
+                sink = batch_writer(self.output, output_format, columns=columns)
+                progress = ProgressReporter(self.log, "rows")
+                with progress, sink, BackgroundWriter(sink) as writer, BatchSaver(writer, flush_rows) as saver:
+                    while True:
+                        rows = cursor.fetchmany(page_size)
+                        if not rows:
+                            break
+
+                        if as_dicts:
+                            rows = [dict(zip(columns, row)) for row in rows]
 
-                    # Save the fetched rows to a file
-                    self.output.save(rows)
+                        # Save the fetched rows to a file
+                        saver.extend(rows)
 
-                    # Update the number of processed rows
-                    processed_rows += len(rows)
-                    self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
+                        # Update the number of processed rows
+                        processed_rows += len(rows)
+                        progress.add(len(rows))
 
                 # Update the state
-                current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = processed_rows
-                self.state.set_state(self.id, current_state)
+                update_state(self.state, self.id, success=True, processed_rows=processed_rows)
 
             # Log the total number of rows processed
-            self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
+            self.log.info(f"Total rows processed: {processed_rows}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from TiDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            connection.close()
+            update_state(self.state, self.id, success=False)
@@ -13,11 +13,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict
+import atexit
+import functools
+import os
+import time
+from typing import Any, List, Optional
 
-import psycopg2
+import psycopg
 from geniusrise import BatchOutput, Spout, State
-from psycopg2.extras import DictCursor
+
+from geniusrise_databases.utils import (
+    WRITE_BUFFER_SIZE,
+    BackgroundWriter,
+    BatchSaver,
+    ConnectionPool,
+    ProgressReporter,
+    batch_writer,
+    select_columns,
+    update_state,
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_pool(host: str, port: int, user: str, password: str, database: str) -> ConnectionPool:
+    pool = ConnectionPool(
+        functools.partial(
+            psycopg.connect,
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            dbname=database,
+        )
+    )
+    atexit.register(pool.close)
+    return pool
 
 
 class TimescaleDB(Spout):
@@ -74,7 +104,11 @@ class TimescaleDB(Spout):
         password: str,
         database: str,
         query: str,
-        page_size: int = 100,
+        page_size: int = 1000,
+        columns: Optional[List[str]] = None,
+        flush_rows: int = 100000,
+        fetch_mode: str = "select",
+        output_format: str = "json",
     ) -> None:
         """
         📖 Fetch data from a TimescaleDB hypertable and save it in batch.
@@ -86,63 +120,117 @@ class TimescaleDB(Spout):
             password (str): The TimescaleDB password.
             database (str): The TimescaleDB database name.
             query (str): The SQL query to execute.
-            page_size (int): The number of rows to fetch per page. Defaults to 100.
+            page_size (int): The number of rows to fetch per page. Defaults to 1000.
+            columns (Optional[List[str]]): The columns to select in place of a leading `SELECT *` of the query,
+                so that the other columns of wide tables are never read or sent over. Defaults to None.
+            flush_rows (int): The number of rows to collect into each saved batch, so that fewer and larger
+                batches are written. Defaults to 100000.
+            fetch_mode (str): "select" to save the rows in batches, or "copy" to write the whole result to a single
+                file in PostgreSQL's binary COPY format, which skips decoding the rows. Defaults to "select".
+            output_format (str): "json" to save batches as they are, or "jsonl", "jsonl.zst", "msgpack" or
+                "parquet" to write the rows into a single newline-delimited JSON, compressed
+                newline-delimited JSON, MessagePack or Parquet file. Defaults to "json".
 
         Raises:
             Exception: If unable to connect to the TimescaleDB server or execute the query.
         """
-        # Initialize TimescaleDB connection
-        connection = psycopg2.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            dbname=database,
-            cursor_factory=DictCursor,
-        )
+        # Reuse the pooled TimescaleDB connections across fetches
+        pool = _get_pool(host, port, user, password, database)
 
         try:
-            with connection.cursor() as cursor:
+            query = select_columns(query, columns)
+            if fetch_mode == "copy":
+                # Stream the binary COPY of the result straight into a file, without decoding a single row
+                processed_rows = self._copy(pool, query)
+            else:
+                processed_rows = self._select(pool, query, page_size, flush_rows, output_format)
+
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+            # Log the total number of rows processed
+            self.log.info(f"Total rows processed: {processed_rows}")
+
+        except Exception as e:
+            self.log.error(f"Error fetching data from TimescaleDB: {e}")
+
+            # Update the state
+            update_state(self.state, self.id, success=False)
+
+    def _select(self, pool: ConnectionPool, query: str, page_size: int, flush_rows: int, output_format: str) -> int:
+        """
+        Run the query on a server-side cursor and save its rows in batch.
+
+        Args:
+            pool (ConnectionPool): The TimescaleDB connection pool.
+            query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per page.
+            flush_rows (int): The number of rows to collect into each saved batch.
+            output_format (str): The output format, see `fetch`.
+
+        Returns:
+            int: The number of rows read.
+        """
+        with pool.connection() as connection:
+            # Stream the rows through a server-side cursor, so that the result set is never buffered in full, in
+            # the binary protocol, so that numbers and timestamps are decoded in C instead of parsed from text
+            with connection.cursor(name="timescaledb_fetch", binary=True) as cursor:
+                cursor.itersize = page_size
+                cursor.arraysize = page_size
                 cursor.execute(query)
-                total_rows = cursor.rowcount
                 processed_rows = 0
 
-                while True:
-                    rows = cursor.fetchmany(page_size)
-                    if not rows:
-                        break
+                # The rows are plain tuples, whose column names a server-side cursor knows once the first have arrived
+                rows = cursor.fetchmany(page_size)
+                columns = [column[0] for column in cursor.description or []]
 
-                    # Save the fetched rows to a file
-                    self.output.save(rows)
+                # Parquet transposes the row tuples into columns as they are, the other formats need dicts
+                as_dicts = output_format != "parquet"
 
-                    # Update the number of processed rows
-                    processed_rows += len(rows)
-                    self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
+                # Collect the pages into larger batches, saved on a writer thread while the cursor fetches on, the
+                # compressed file formats are encoded and compressed on that thread too
+                sink = batch_writer(self.output, output_format, columns=columns)
+                progress = ProgressReporter(self.log, "rows")
+                with progress, sink, BackgroundWriter(sink) as writer, BatchSaver(writer, flush_rows) as saver:
+                    while rows:
+                        if as_dicts:
+                            rows = [dict(zip(columns, row)) for row in rows]
 
-                # Update the state
-                current_state: Dict[str, Any] = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = processed_rows
-                self.state.set_state(self.id, current_state)
+                        # Save the fetched rows to a file
+                        saver.extend(rows)
 
-            # Log the total number of rows processed
-            self.log.info(f"Total rows processed: {processed_rows}/{total_rows}")
+                        # Update the number of processed rows
+                        processed_rows += len(rows)
+                        progress.add(len(rows))
 
-        except Exception as e:
-            self.log.error(f"Error fetching data from TimescaleDB: {e}")
+                        rows = cursor.fetchmany(page_size)
 
-            # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            connection.close()
+            # End the transaction of the server-side cursor before the connection goes back to the pool
+            connection.rollback()
+
+        return processed_rows
+
+    def _copy(self, pool: ConnectionPool, query: str) -> int:
+        """
+        Write the result of the query to a file in the output folder, in the binary format of PostgreSQL's COPY.
+
+        Args:
+            pool (ConnectionPool): The TimescaleDB connection pool.
+            query (str): The SQL query to execute.
+
+        Returns:
+            int: The number of rows copied.
+        """
+        path = os.path.join(self.output.output_folder, f"{time.time()}.pgcopy")
+
+        with pool.connection() as connection:
+            with connection.cursor() as cursor, open(path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+                with cursor.copy(f"COPY ({query}) TO STDOUT WITH (FORMAT BINARY)") as copy:
+                    for data in copy:
+                        f.write(data)
+                processed_rows = cursor.rowcount
+
+            # End the transaction of the copy before the connection goes back to the pool
+            connection.rollback()
+
+        return processed_rows
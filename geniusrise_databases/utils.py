@@ -0,0 +1,900 @@
+# 🧠 Geniusrise
+# Copyright (C) 2023  geniusrise.ai
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import base64
+import contextlib
+import datetime
+import decimal
+import itertools
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import cachetools
+import msgpack
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+import zstandard
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Number of rows between progress log lines in the per-row fetch loops
+LOG_EVERY = 10000
+
+# Size of the write buffer of the local output files, so that many small saves are
+# coalesced into a few large write syscalls
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+async def gather_bounded(aws: Iterable[Awaitable[T]], concurrency: int = 32) -> List[T]:
+    """
+    Await a collection of awaitables concurrently, with at most `concurrency` in flight at once.
+
+    Args:
+        aws (Iterable[Awaitable[T]]): The awaitables to run.
+        concurrency (int): The maximum number of awaitables running at once. Defaults to 32.
+
+    Returns:
+        List[T]: The results, in the order of the given awaitables.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
+
+
+def map_threads(function: Callable[[T], R], items: Iterable[T], stop: threading.Event) -> List[R]:
+    """
+    Call a function on every item, each on its own thread, and stop all of them at the first failure.
+
+    On the first exception `stop` is set and the calls that have not started yet are cancelled, so that
+    workers checking `stop` between pages return early instead of reading the rest of their share. The
+    exception is re-raised once the running calls have returned.
+
+    Args:
+        function (Callable[[T], R]): The function to call.
+        items (Iterable[T]): The items to call it on.
+        stop (threading.Event): The event to set on the first failure, shared with the workers.
+
+    Returns:
+        List[R]: The results, in the order of the items.
+    """
+    items = list(items)
+    with ThreadPoolExecutor(max_workers=max(len(items), 1)) as executor:
+        futures = [executor.submit(function, item) for item in items]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        error = next((future.exception() for future in futures if future in done and future.exception()), None)
+        if error:
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+    if error:
+        raise error
+    return [future.result() for future in futures]
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of `size` items, the last one possibly shorter.
+
+    Args:
+        iterable (Iterable[T]): The items to split.
+        size (int): The number of items per list.
+
+    Yields:
+        List[T]: The next list of items.
+    """
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def split_range(low: Any, high: Any, parts: int) -> List[Tuple[Any, Any]]:
+    """
+    Split the range from `low` to `high` into at most `parts` adjacent ranges of equal width.
+
+    Works for any values whose differences can be scaled by integers, such as numbers, dates and datetimes.
+
+    Args:
+        low (Any): The lowest value.
+        high (Any): The highest value.
+        parts (int): The number of ranges.
+
+    Returns:
+        List[Tuple[Any, Any]]: The (start, stop) bounds of each range, the stop of one being the start of the next.
+    """
+    # Keep integer bounds integers, anything else is divided exactly
+    if isinstance(low, int) and isinstance(high, int):
+        bounds = [low + (high - low) * i // parts for i in range(parts)]
+    else:
+        bounds = [low + (high - low) * i / parts for i in range(parts)]
+
+    bounds = list(dict.fromkeys(bounds + [high]))
+    return list(zip(bounds, bounds[1:])) or [(low, high)]
+
+
+def select_columns(query: str, columns: Optional[List[str]], quote: str = '"') -> str:
+    """
+    Replace the leading `SELECT *` of a query with a list of columns, so that only those are read and sent over.
+
+    Args:
+        query (str): The SQL query.
+        columns (Optional[List[str]]): The columns to select. The query is returned as it is when None or empty.
+        quote (str): The identifier quote character of the database, doubled inside names. Defaults to '"'.
+
+    Returns:
+        str: The query selecting only the given columns.
+    """
+    if not columns:
+        return query
+
+    projection = ", ".join(quote + column.replace(quote, quote * 2) + quote for column in columns)
+    return re.sub(r"^\s*SELECT\s+\*", lambda _: f"SELECT {projection}", query, count=1, flags=re.IGNORECASE)
+
+
+def as_subquery(query: str, alias: str = "sub") -> str:
+    """
+    Wrap a query as a derived table, so that its results can be filtered or aggregated.
+
+    A trailing semicolon is stripped. Queries that can't be wrapped are rejected: those starting with
+    common table expressions, which must begin the statement, and those with a top-level ORDER BY,
+    which most databases don't allow in a derived table.
+
+    Args:
+        query (str): The SQL query.
+        alias (str): The name of the derived table. Defaults to "sub".
+
+    Returns:
+        str: The query as a derived table, e.g. `(SELECT ...) AS sub`.
+
+    Raises:
+        ValueError: If the query starts with WITH or has a top-level ORDER BY.
+    """
+    query = query.strip().rstrip(";").rstrip()
+    if re.match(r"WITH\b", query, flags=re.IGNORECASE):
+        raise ValueError("Queries with common table expressions can't be wrapped as a subquery")
+
+    # Blank out literals, quoted names and comments, then parenthesized parts, to leave the top level
+    top_level = re.sub(r"'(?:[^']|'')*'|\"[^\"]*\"|\[[^\]]*\]|--[^\n]*|/\*.*?\*/", " ", query, flags=re.DOTALL)
+    while True:
+        stripped = re.sub(r"\([^()]*\)", " ", top_level)
+        if stripped == top_level:
+            break
+        top_level = stripped
+    if re.search(r"\bORDER\s+BY\b", top_level, flags=re.IGNORECASE):
+        raise ValueError("Queries with a top-level ORDER BY can't be wrapped as a subquery")
+
+    return f"({query}) AS {alias}"
+
+
+def update_state(
+    state: Any,
+    key: str,
+    success: bool,
+    fields: Optional[Dict[str, Any]] = None,
+    **counters: int,
+) -> None:
+    """
+    Record the outcome of a fetch in the state, adding `counters` to the stored totals.
+
+    Uses the state backend's atomic `incr(key, field, delta)` when it provides one,
+    otherwise falls back to a single read-modify-write of the state dict.
+
+    Args:
+        state (State): The state to update.
+        key (str): The state key, usually the spout id.
+        success (bool): Whether the fetch succeeded.
+        fields (Optional[Dict[str, Any]]): Fields to set as they are, e.g. to clear a resume checkpoint.
+        **counters (int): Additional counters to add, e.g. `processed_rows`.
+    """
+    deltas = {"success_count": int(success), "failure_count": int(not success), **counters}
+
+    if hasattr(state, "incr"):
+        for field, delta in deltas.items():
+            if delta:
+                state.incr(key, field, delta)
+        if fields:
+            state.set_state(key, {**(state.get_state(key) or {}), **fields})
+        return
+
+    current_state = state.get_state(key) or {}
+    current_state.update(fields or {})
+    for field, delta in deltas.items():
+        current_state[field] = current_state.get(field, 0) + delta
+    state.set_state(key, current_state)
+
+
+class CachedState:
+    """
+    A write-through cache in front of a state store.
+
+    Reads are served from memory for `ttl` seconds after the key was last read or written,
+    writes go to both the cache and the wrapped store. The short TTL keeps processes sharing
+    the same store consistent at the granularity of a fetch. Other attributes, such as an atomic
+    `incr`, are those of the wrapped store, and `incr` drops the cached value of its key.
+
+    Args:
+        state (State): The state store to wrap.
+        maxsize (int): The maximum number of keys to cache. Defaults to 1024.
+        ttl (float): The number of seconds a cached value is served for. Defaults to 1.0.
+    """
+
+    def __init__(self, state: Any, maxsize: int = 1024, ttl: float = 1.0) -> None:
+        self._inner = state
+        self._cache: cachetools.TTLCache = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get_state(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the state for a key, from the cache if it is still fresh.
+
+        Args:
+            key (str): The state key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The state, or None if there is none.
+        """
+        with self._lock:
+            value = self._cache.get(key)
+        if value is None:
+            value = self._inner.get_state(key)
+            if value is not None:
+                with self._lock:
+                    self._cache[key] = value
+        return value
+
+    def set_state(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Set the state for a key in both the cache and the wrapped store.
+
+        Args:
+            key (str): The state key.
+            value (Dict[str, Any]): The state.
+        """
+        with self._lock:
+            self._cache[key] = value
+        self._inner.set_state(key, value)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not defined here, guard against lookups before __init__ has run
+        if name == "_inner":
+            raise AttributeError(name)
+
+        attr = getattr(self._inner, name)
+        if name != "incr":
+            return attr
+
+        def incr(key: str, field: str, delta: int) -> Any:
+            result = attr(key, field, delta)
+            with self._lock:
+                self._cache.pop(key, None)
+            return result
+
+        return incr
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of connections, for drivers that don't pool their own.
+
+    Connections are opened on demand, at most `size` at a time, and handed to one thread at a time.
+    A connection whose block raises is closed rather than returned, as it may be left mid-result.
+
+    Args:
+        connect (Callable[[], Any]): Opens a new connection.
+        size (int): The maximum number of open connections. Defaults to 10.
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int = 10) -> None:
+        self._connect = connect
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrow a connection, blocking while all `size` connections are in use.
+
+        Yields:
+            Any: An idle connection, or a new one if none is idle.
+        """
+        with self._slots:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+
+            try:
+                yield connection
+            except BaseException:
+                connection.close()
+                raise
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        """
+        Close the idle connections.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class ProgressReporter:
+    """
+    Log the number of processed items, and the rate, every few seconds from a background thread.
+
+    Fetch loops, possibly on several threads, only add to a counter, which keeps log formatting and
+    handler I/O out of the hot path.
+
+    Args:
+        log (logging.Logger): The logger to report to.
+        label (str): What is counted, e.g. "rows".
+        interval (float): The number of seconds between reports. Defaults to 5.0.
+    """
+
+    def __init__(self, log: Any, label: str, interval: float = 5.0) -> None:
+        self.log = log
+        self.label = label
+        self.interval = interval
+        self.count = 0
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, count: int) -> None:
+        """
+        Add processed items to the counter.
+
+        Args:
+            count (int): The number of items processed.
+        """
+        with self._lock:
+            self.count += count
+
+    def close(self) -> None:
+        """
+        Stop reporting.
+        """
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            # Skip formatting reports that the logger would discard
+            if not self.log.isEnabledFor(logging.INFO):
+                continue
+
+            rate = self.count / (time.monotonic() - self._started)
+            self.log.info(f"Total {self.label} processed: {self.count} ({rate:.0f}/s)")
+
+    def __enter__(self) -> "ProgressReporter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class Checkpoint:
+    """
+    Record per-page progress, such as continuation tokens, in the state without writing it on every page.
+
+    Updates are held in memory and written to the state at most every `pages` updates or every
+    `interval` seconds, whichever comes first, and on `flush`. Dict fields are merged into the
+    stored dict, so concurrent workers can each record their own entry.
+
+    Args:
+        state (State): The state to write the progress to.
+        key (str): The state key, usually the spout id.
+        interval (float): The maximum number of seconds between writes. Defaults to 5.0.
+        pages (int): The maximum number of updates between writes. Defaults to 50.
+    """
+
+    def __init__(self, state: Any, key: str, interval: float = 5.0, pages: int = 50) -> None:
+        self.state = state
+        self.key = key
+        self.interval = interval
+        self.pages = pages
+        self._pending: Dict[str, Any] = {}
+        self._updates = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update(self, **fields: Any) -> None:
+        """
+        Record the progress of a page, writing it to the state if enough pages or time have passed.
+
+        Args:
+            **fields (Any): The state fields to set; dict values are merged into the previous ones.
+        """
+        with self._lock:
+            for field, value in fields.items():
+                if isinstance(value, dict):
+                    self._pending.setdefault(field, {}).update(value)
+                else:
+                    self._pending[field] = value
+            self._updates += 1
+
+            if self._updates >= self.pages or time.monotonic() - self._last_flush >= self.interval:
+                self._flush()
+
+    def flush(self) -> None:
+        """
+        Write any progress not yet written to the state.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            current_state = self.state.get_state(self.key) or {}
+            for field, value in self._pending.items():
+                if isinstance(value, dict):
+                    current_state[field] = {**(current_state.get(field) or {}), **value}
+                else:
+                    current_state[field] = value
+            self.state.set_state(self.key, current_state)
+
+        self._pending = {}
+        self._updates = 0
+        self._last_flush = time.monotonic()
+
+
+def _conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    # Cast the columns of the batch to the schema, filling the ones it lacks with nulls
+    names = batch.schema.names
+    arrays = [
+        batch.column(names.index(field.name)).cast(field.type)
+        if field.name in names
+        else pa.nulls(batch.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ParquetWriter:
+    """
+    Write batches of rows as row groups of a single Parquet file in the output folder.
+
+    The schema is inferred from the first row group, and the file is uploaded along with the rest
+    of the output folder when the output is flushed. Rows are dicts, or tuples in the order of
+    `columns` when given, which are transposed straight into Arrow columns without building a
+    dict per row.
+
+    Later row groups are cast to the schema of the file, with nulls for the columns they lack.
+    A row group that widens the schema, with new columns or a type for a column that was only
+    null so far, starts a new part of the file named `<name>.<part>.parquet` with the wider
+    schema, since a Parquet file has a single schema.
+
+    Args:
+        output (BatchOutput): The output whose folder the file is written to.
+        filename (Optional[str]): The name of the Parquet file. Defaults to a timestamp.
+        row_group_size (int): The number of rows to buffer per row group. Defaults to 65536.
+        columns (Optional[List[str]]): The column names of tuple rows, e.g. from a DB-API cursor
+            description. Defaults to None, for dict rows.
+    """
+
+    def __init__(
+        self,
+        output: Any,
+        filename: Optional[str] = None,
+        row_group_size: int = 65536,
+        columns: Optional[List[str]] = None,
+    ) -> None:
+        self.path = os.path.join(output.output_folder, filename or f"{time.time()}.parquet")
+        self.row_group_size = row_group_size
+        self.columns = columns
+        self._rows: List[Any] = []
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._part = 0
+
+    def save(self, rows: List[Any]) -> None:
+        """
+        Buffer rows and write a row group whenever enough rows have been buffered.
+
+        Args:
+            rows (List[Any]): The rows to write.
+        """
+        self._rows.extend(rows)
+        if len(self._rows) >= self.row_group_size:
+            self._write()
+
+    def write(self, row: Any) -> None:
+        """
+        Buffer a single row.
+
+        Args:
+            row (Any): The row to write.
+        """
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._write()
+
+    def close(self) -> None:
+        """
+        Write any buffered rows and close the file.
+        """
+        self._write()
+        if self._writer:
+            self._writer.close()
+
+    def _write(self) -> None:
+        if not self._rows:
+            return
+
+        if self.columns:
+            arrays = [pa.array(values) for values in zip(*self._rows)]
+            batch = pa.RecordBatch.from_arrays(arrays, names=self.columns)
+        else:
+            # Take the columns of every row, since documents need not all have the same fields
+            names = list(dict.fromkeys(name for row in self._rows for name in row))
+            arrays = [pa.array([row.get(name) for row in self._rows]) for name in names]
+            batch = pa.RecordBatch.from_arrays(arrays, names=names)
+
+        if self._writer and not batch.schema.equals(self._writer.schema):
+            try:
+                schema = pa.unify_schemas([self._writer.schema, batch.schema])
+                if not schema.equals(self._writer.schema):
+                    self._writer.close()
+                    self._writer = None
+                    self._part += 1
+                batch = _conform(batch, schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                self._rows = []
+                raise ValueError(f"Rows do not fit the schema of {self.path}: {e}") from e
+
+        if not self._writer:
+            root, extension = os.path.splitext(self.path)
+            path = f"{root}.{self._part}{extension}" if self._part else self.path
+            self._writer = pq.ParquetWriter(path, batch.schema)
+
+        self._writer.write_batch(batch)
+        self._rows = []
+
+    def __enter__(self) -> "ParquetWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _json_default(obj: Any) -> Any:
+    # DynamoDB returns every number as a Decimal
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj.is_finite() and obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode()
+    return str(obj)
+
+
+class JSONLinesWriter:
+    """
+    Write batches of rows as newline-delimited JSON to a single file in the output folder.
+
+    Rows are encoded with orjson, which also handles numpy values, non-string keys, datetimes
+    and UUIDs natively. Decimals are written as numbers, bytes as base64 and anything else,
+    such as BSON ObjectIds, as its string form.
+
+    Args:
+        output (BatchOutput): The output whose folder the file is written to.
+        filename (Optional[str]): The name of the file. Defaults to a timestamp.
+        buffer_size (int): The size of the write buffer in bytes. Defaults to 1 MiB.
+        compression (Optional[str]): "zstd" to compress the file with Zstandard at level 3 on all
+            cores and append ".zst" to its name. Defaults to None, which writes plain JSON lines.
+    """
+
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    EXTENSION = ".jsonl"
+
+    def __init__(
+        self,
+        output: Any,
+        filename: Optional[str] = None,
+        buffer_size: int = WRITE_BUFFER_SIZE,
+        compression: Optional[str] = None,
+    ) -> None:
+        filename = filename or f"{time.time()}{self.EXTENSION}"
+        if compression == "zstd":
+            filename += ".zst"
+
+        self.path = os.path.join(output.output_folder, filename)
+        self._file: Any = open(self.path, "wb", buffering=buffer_size)
+        if compression == "zstd":
+            self._file = zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(self._file)
+
+    def save(self, rows: Iterable[Any]) -> None:
+        """
+        Encode and append rows to the file.
+
+        Args:
+            rows (Iterable[Any]): The rows to write.
+        """
+        self._file.write(b"".join(self.encode(row) for row in rows))
+
+    def write(self, row: Any) -> None:
+        """
+        Encode and append a single row to the file, without buffering it as an object.
+
+        Args:
+            row (Any): The row to write.
+        """
+        self._file.write(self.encode(row))
+
+    def encode(self, row: Any) -> bytes:
+        """
+        Encode a single row as a line of JSON.
+
+        Args:
+            row (Any): The row to encode.
+
+        Returns:
+            bytes: The encoded row, including the trailing newline.
+        """
+        return orjson.dumps(row, default=_json_default, option=self.OPTIONS)
+
+    def close(self) -> None:
+        """
+        Close the file, finishing the compressed frame if any.
+        """
+        self._file.close()
+
+    def __enter__(self) -> "JSONLinesWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    return _json_default(obj)
+
+
+class MessagePackWriter(JSONLinesWriter):
+    """
+    Write batches of rows as a stream of MessagePack maps to a single file in the output folder.
+
+    MessagePack keeps bytes as binary and is decoded several times faster than JSON, which suits
+    output that is re-ingested by another pipeline rather than read by people. Datetimes are written
+    as ISO 8601 strings, other values as in `JSONLinesWriter`.
+
+    Args:
+        output (BatchOutput): The output whose folder the file is written to.
+        filename (Optional[str]): The name of the file. Defaults to a timestamp.
+        buffer_size (int): The size of the write buffer in bytes. Defaults to 1 MiB.
+        compression (Optional[str]): "zstd" to compress the file with Zstandard. Defaults to None.
+    """
+
+    EXTENSION = ".msgpack"
+
+    def encode(self, row: Any) -> bytes:
+        """
+        Encode a single row as MessagePack.
+
+        Args:
+            row (Any): The row to encode.
+
+        Returns:
+            bytes: The encoded row.
+        """
+        return msgpack.packb(row, default=_msgpack_default, use_bin_type=True)
+
+
+class BatchSaver:
+    """
+    Collect rows written one at a time into batches saved through `output.save`.
+
+    Args:
+        output (BatchOutput): The output to save the batches to.
+        batch_size (int): The number of rows per batch. Defaults to 1000.
+    """
+
+    def __init__(self, output: Any, batch_size: int = 1000) -> None:
+        self.output = output
+        self.batch_size = batch_size
+        self._rows: List[Any] = []
+
+    def save(self, rows: List[Any]) -> None:
+        """
+        Save a batch of rows as it is, after any rows written before it.
+
+        Args:
+            rows (List[Any]): The rows to save.
+        """
+        self.flush()
+        self.output.save(rows)
+
+    def extend(self, rows: Iterable[Any]) -> None:
+        """
+        Buffer many rows, saving batches of `batch_size` rows as they fill up.
+
+        Args:
+            rows (Iterable[Any]): The rows to write.
+        """
+        self._rows.extend(rows)
+        while len(self._rows) >= self.batch_size:
+            self.output.save(self._rows[: self.batch_size])
+            self._rows = self._rows[self.batch_size :]
+
+    def write(self, row: Any) -> None:
+        """
+        Buffer a single row, saving the batch once it is full.
+
+        Args:
+            row (Any): The row to write.
+        """
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Save any buffered rows.
+        """
+        if self._rows:
+            self.output.save(self._rows)
+            self._rows = []
+
+    def close(self) -> None:
+        """
+        Save any buffered rows.
+        """
+        self.flush()
+
+    def __enter__(self) -> "BatchSaver":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def batch_writer(
+    output: Any,
+    output_format: str = "json",
+    batch_size: int = 1000,
+    columns: Optional[List[str]] = None,
+    documents: bool = False,
+) -> ContextManager[Any]:
+    """
+    Open a writer for rows in the given format.
+
+    Rows can be written in batches with `save(rows)` or one at a time with `write(row)`. Writing
+    single rows in the "jsonl" format encodes each row straight into the file, so no batch of rows
+    is ever held in memory.
+
+    Args:
+        output (BatchOutput): The output to write to.
+        output_format (str): "json" saves batches through `output.save`, while "jsonl", "jsonl.zst",
+            "msgpack" and "parquet" write all rows into one newline-delimited JSON, Zstandard-compressed
+            newline-delimited JSON, MessagePack or Parquet file in the output folder. Defaults to "json".
+        batch_size (int): The number of single rows to collect per batch in the "json" format.
+            Defaults to 1000.
+        columns (Optional[List[str]]): The column names of tuple rows in the "parquet" format, which
+            skips building a dict per row. Defaults to None, for dict rows.
+        documents (bool): Whether the rows are schemaless documents, whose nested and varying fields
+            do not map onto Parquet columns, which rejects the "parquet" format. Defaults to False.
+
+    Returns:
+        ContextManager: A context manager yielding an object with `save(rows)` and `write(row)` methods.
+
+    Raises:
+        ValueError: If the output format is not one of the above, or is "parquet" for documents.
+    """
+    if documents and output_format == "parquet":
+        raise ValueError("The parquet output format is not supported for documents")
+    if output_format == "jsonl":
+        return JSONLinesWriter(output)
+    if output_format == "jsonl.zst":
+        return JSONLinesWriter(output, compression="zstd")
+    if output_format == "msgpack":
+        return MessagePackWriter(output)
+    if output_format == "parquet":
+        return ParquetWriter(output, columns=columns)
+    if output_format == "json":
+        return BatchSaver(output, batch_size)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+class BackgroundWriter:
+    """
+    Save batches on a dedicated writer thread so output I/O overlaps with fetching.
+
+    Batches are handed over through a bounded queue, which applies back-pressure once the
+    writer falls `depth` batches behind. Empty batches are not saved, but their `on_saved`
+    callbacks still run in order. An error raised while saving is re-raised to the producer
+    on its next `save` or on `close`.
+
+    Args:
+        output (Any): The object whose `save` method persists batches, e.g. a BatchOutput.
+        depth (int): The maximum number of batches waiting to be saved. Defaults to 2.
+    """
+
+    _DONE = object()
+
+    def __init__(self, output: Any, depth: int = 2) -> None:
+        self.output = output
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def save(self, batch: Any, on_saved: Optional[Callable[[], None]] = None) -> None:
+        """
+        Queue a batch to be saved, blocking while the queue is full.
+
+        Args:
+            batch (Any): The batch to save.
+            on_saved (Optional[Callable[[], None]]): Called on the writer thread once the batch is saved,
+                e.g. to checkpoint progress only after the data is safely written.
+        """
+        if self._error:
+            raise self._error
+        self._queue.put((batch, on_saved))
+
+    def close(self) -> None:
+        """
+        Wait for all queued batches to be saved and stop the writer thread.
+        """
+        self._queue.put(self._DONE)
+        self._thread.join()
+        if self._error:
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if self._error:
+                continue
+            batch, on_saved = item
+            try:
+                if batch:
+                    self.output.save(batch)
+                if on_saved:
+                    on_saved()
+            except Exception as e:
+                self._error = e
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.close()
+            return
+
+        # Don't mask the producer's exception with a writer error
+        self._queue.put(self._DONE)
+        self._thread.join()
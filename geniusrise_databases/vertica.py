@@ -13,9 +13,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import functools
+import threading
+from typing import List, Optional
+
 import vertica_python
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import (
+    BackgroundWriter,
+    BatchSaver,
+    ConnectionPool,
+    map_threads,
+    select_columns,
+    update_state,
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_pool(host: str, port: int, user: str, password: str, database: str) -> ConnectionPool:
+    # Autocommit, so that a pooled connection is never left inside the transaction of a previous fetch
+    pool = ConnectionPool(
+        functools.partial(
+            vertica_python.connect,
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            database=database,
+            autocommit=True,
+        )
+    )
+    atexit.register(pool.close)
+    return pool
+
 
 class Vertica(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -62,7 +94,20 @@ class Vertica(Spout):
         super().__init__(output, state)
         self.top_level_arguments = kwargs
 
-    def fetch(self, host: str, port: int, user: str, password: str, database: str, query: str):
+    def fetch(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        query: str,
+        page_size: int = 10000,
+        columns: Optional[List[str]] = None,
+        flush_rows: int = 100000,
+        partition_column: Optional[str] = None,
+        parallelism: int = 1,
+    ):
         """
         📖 Fetch data from a Vertica database and save it in batch.
 
@@ -73,47 +118,90 @@ class Vertica(Spout):
             password (str): The Vertica password.
             database (str): The Vertica database name.
             query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per page. Defaults to 10000.
+            columns (Optional[List[str]]): The columns to select in place of a leading `SELECT *` of the query,
+                so that the other columns of wide tables are never read or sent over. Defaults to None.
+            flush_rows (int): The number of rows to collect into each saved batch, so that fewer and larger
+                batches are written. Defaults to 100000.
+            partition_column (Optional[str]): A column of the query to hash into `parallelism` disjoint shards
+                that are scanned in parallel. Defaults to None.
+            parallelism (int): The number of shards to split the scan into, at most 10 run at once. Defaults to 1.
 
         Raises:
             Exception: If unable to connect to the Vertica server or execute the query.
         """
-        # Initialize Vertica connection
-        connection = vertica_python.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-        )
+        # Reuse the pooled Vertica connections across fetches
+        pool = _get_pool(host, port, user, password, database)
 
         try:
-            # Execute the query and save the results to a file
-            with connection.cursor() as cursor:
-                cursor.execute(query)
-                results = cursor.fetchall()
-                self.output.save(results)
-
-                # Update the state
-                current_state = self.state.get_state(self.id) or {
-                    "success_count": 0,
-                    "failure_count": 0,
-                    "processed_rows": 0,
-                }
-                current_state["success_count"] += 1
-                current_state["processed_rows"] = len(results)
-                self.state.set_state(self.id, current_state)
+            query = select_columns(query, columns)
+            if partition_column and parallelism > 1:
+                # Split the query into disjoint hash shards of the partition column, scanned in parallel
+                shards = [
+                    f"SELECT * FROM ({query}) AS sub WHERE MOD(HASH({partition_column}), {parallelism}) = {shard}"
+                    for shard in range(parallelism)
+                ]
+            else:
+                shards = [query]
+
+            # Save the batches of all shards on a single writer thread while the cursors fetch on
+            with BackgroundWriter(self.output) as writer:
+                stop = threading.Event()
+                processed_rows = sum(
+                    map_threads(
+                        lambda shard: self._scan(pool, shard, page_size, flush_rows, writer, stop), shards, stop
+                    )
+                )
+
+            # Update the state
+            update_state(self.state, self.id, success=True, processed_rows=processed_rows)
+
+            # Log the total number of rows processed
+            self.log.info(f"Total rows processed: {processed_rows}")
 
         except Exception as e:
             self.log.error(f"Error fetching data from Vertica: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_rows": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
-
-        finally:
-            connection.close()
+            update_state(self.state, self.id, success=False)
+
+    def _scan(
+        self,
+        pool: ConnectionPool,
+        query: str,
+        page_size: int,
+        flush_rows: int,
+        writer: BackgroundWriter,
+        stop: threading.Event,
+    ) -> int:
+        """
+        Run a query on a pooled connection and queue its rows to be saved.
+
+        Args:
+            pool (ConnectionPool): The Vertica connection pool.
+            query (str): The SQL query to execute.
+            page_size (int): The number of rows to fetch per page.
+            flush_rows (int): The number of rows to collect into each saved batch.
+            writer (BackgroundWriter): The writer to queue the batches to.
+            stop (threading.Event): Set when another worker failed, to return without reading the rest.
+
+        Returns:
+            int: The number of rows read.
+        """
+        processed_rows = 0
+
+        # Execute the query, the rows are streamed from the server as they are read
+        with pool.connection() as connection, connection.cursor() as cursor:
+            cursor.arraysize = page_size
+            cursor.execute(query)
+
+            # Collect the pages into larger batches
+            with BatchSaver(writer, flush_rows) as saver:
+                while not stop.is_set() and (rows := cursor.fetchmany(page_size)):
+                    # Save the fetched rows to a file
+                    saver.extend(rows)
+
+                    # Update the number of processed rows
+                    processed_rows += len(rows)
+
+        return processed_rows
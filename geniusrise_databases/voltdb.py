@@ -16,6 +16,8 @@
 import voltdb
 from geniusrise import BatchOutput, Spout, State
 
+from geniusrise_databases.utils import ProgressReporter, batched, update_state
+
 
 class VoltDB(Spout):
     def __init__(self, output: BatchOutput, state: State, **kwargs):
@@ -66,6 +68,7 @@ class VoltDB(Spout):
         port: int,
         username: str,
         password: str,
+        batch_size: int = 100,
     ):
         """
         📖 Fetch data from a VoltDB database and save it in batch.
@@ -75,6 +78,7 @@ class VoltDB(Spout):
             port (int): The VoltDB port.
             username (str): The VoltDB username.
             password (str): The VoltDB password.
+            batch_size (int): The number of tables to save per batch. Defaults to 100.
 
         Raises:
             Exception: If unable to connect to the VoltDB server or execute the query.
@@ -86,37 +90,24 @@ class VoltDB(Spout):
             # Connect to the database
             client.create_session(username, password)
 
-            # Get the number of tables in the database
-            table_count = len(client.get_tables())
-
-            # Iterate through each table in the database
+            # Get the tables in the database
             tables = client.get_tables()
+            table_count = len(tables)
             processed_tables = 0
 
-            while True:
-                # Get a batch of tables
-                batch = tables[::100]
-
-                # Check if there are any tables in the batch
-                if not batch:
-                    break
-
-                # Save the batch of tables to a file
-                self.output.save(batch)
+            # Iterate through the tables in consecutive batches
+            progress = ProgressReporter(self.log, "tables")
+            with progress:
+                for batch in batched(tables, batch_size):
+                    # Save the batch of tables to a file
+                    self.output.save(batch)
 
-                # Update the number of processed tables
-                processed_tables += len(batch)
-                self.log.info(f"Total tables processed: {processed_tables}/{table_count}")
+                    # Update the number of processed tables
+                    processed_tables += len(batch)
+                    progress.add(len(batch))
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_tables": 0,
-            }
-            current_state["success_count"] += 1
-            current_state["processed_tables"] = processed_tables
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=True, processed_tables=processed_tables)
 
             # Log the total number of tables processed
             self.log.info(f"Total tables processed: {processed_tables}/{table_count}")
@@ -125,10 +116,4 @@ class VoltDB(Spout):
             self.log.error(f"Error fetching data from VoltDB: {e}")
 
             # Update the state
-            current_state = self.state.get_state(self.id) or {
-                "success_count": 0,
-                "failure_count": 0,
-                "processed_tables": 0,
-            }
-            current_state["failure_count"] += 1
-            self.state.set_state(self.id, current_state)
+            update_state(self.state, self.id, success=False)
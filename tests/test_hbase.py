@@ -0,0 +1,42 @@
+# 🧠 Geniusrise
+# Copyright (C) 2023  geniusrise.ai
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+pytest.importorskip("happybase")
+pytest.importorskip("geniusrise")
+
+from geniusrise_databases.hbase import _split_key_range  # noqa: E402
+
+
+def test_split_key_range_covers_the_range():
+    ranges = _split_key_range(b"a", b"z", 4)
+
+    assert len(ranges) == 4
+    assert ranges[0][0] == b"a"
+    assert ranges[-1][1] == b"z"
+    assert all(stop == start for (_, stop), (start, _) in zip(ranges, ranges[1:]))
+    assert all(start < stop for start, stop in ranges)
+
+
+def test_split_key_range_pads_keys_of_different_lengths():
+    ranges = _split_key_range(b"a", b"b\xff", 2)
+
+    assert ranges == [(b"a", b"a\xff"), (b"a\xff", b"b\xff")]
+
+
+def test_split_key_range_narrower_than_parts():
+    assert _split_key_range(b"a", b"b", 1000) == [(b"a", b"b")]
+    assert _split_key_range(b"a", b"z", 1) == [(b"a", b"z")]
@@ -0,0 +1,250 @@
+# 🧠 Geniusrise
+# Copyright (C) 2023  geniusrise.ai
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pyarrow.parquet as pq
+import pytest
+
+from geniusrise_databases.utils import (
+    BackgroundWriter,
+    Checkpoint,
+    ParquetWriter,
+    as_subquery,
+    batch_writer,
+    map_threads,
+    split_range,
+)
+
+
+class InMemoryState:
+    def __init__(self):
+        self.store = {}
+        self.writes = 0
+
+    def get_state(self, key):
+        return self.store.get(key)
+
+    def set_state(self, key, value):
+        self.store[key] = value
+        self.writes += 1
+
+
+@pytest.fixture
+def output(tmp_path):
+    return SimpleNamespace(output_folder=str(tmp_path))
+
+
+def read_parts(folder):
+    return {name: pq.read_table(os.path.join(folder, name)).to_pylist() for name in sorted(os.listdir(folder))}
+
+
+def test_parquet_writer_dict_rows(output):
+    with ParquetWriter(output, filename="rows.parquet") as writer:
+        writer.save([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+
+    assert read_parts(output.output_folder) == {
+        "rows.parquet": [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}],
+    }
+
+
+def test_parquet_writer_takes_columns_from_every_row(output):
+    with ParquetWriter(output, filename="rows.parquet") as writer:
+        writer.save([{"id": 1}, {"id": 2, "name": "b"}])
+
+    assert read_parts(output.output_folder) == {
+        "rows.parquet": [{"id": 1, "name": None}, {"id": 2, "name": "b"}],
+    }
+
+
+def test_parquet_writer_fills_missing_columns_with_nulls(output):
+    with ParquetWriter(output, filename="rows.parquet", row_group_size=1) as writer:
+        writer.save([{"id": 1, "name": "a"}])
+        writer.save([{"name": "b"}])
+
+    assert read_parts(output.output_folder) == {
+        "rows.parquet": [{"id": 1, "name": "a"}, {"id": None, "name": "b"}],
+    }
+
+
+def test_parquet_writer_widens_the_schema_in_a_new_part(output):
+    with ParquetWriter(output, filename="rows.parquet", row_group_size=1) as writer:
+        writer.save([{"id": 1, "note": None}])
+        writer.save([{"id": 2, "note": "set"}])
+        writer.save([{"id": 3, "extra": 1.5}])
+
+    assert read_parts(output.output_folder) == {
+        "rows.parquet": [{"id": 1, "note": None}],
+        "rows.1.parquet": [{"id": 2, "note": "set"}],
+        "rows.2.parquet": [{"id": 3, "note": None, "extra": 1.5}],
+    }
+
+
+def test_parquet_writer_tuple_rows(output):
+    with ParquetWriter(output, filename="rows.parquet", row_group_size=1, columns=["id", "name"]) as writer:
+        writer.save([(1, None)])
+        writer.save([(2, "b")])
+
+    assert read_parts(output.output_folder) == {
+        "rows.parquet": [{"id": 1, "name": None}],
+        "rows.1.parquet": [{"id": 2, "name": "b"}],
+    }
+
+
+def test_parquet_writer_rejects_conflicting_types(output):
+    writer = ParquetWriter(output, filename="rows.parquet", row_group_size=1)
+    writer.save([{"id": 1}])
+
+    with pytest.raises(ValueError):
+        writer.save([{"id": "one"}])
+    writer.close()
+
+    assert read_parts(output.output_folder) == {"rows.parquet": [{"id": 1}]}
+
+
+def test_batch_writer_rejects_unknown_formats(output):
+    with pytest.raises(ValueError):
+        batch_writer(output, "csv")
+
+
+def test_batch_writer_rejects_parquet_for_documents(output):
+    with pytest.raises(ValueError):
+        batch_writer(output, "parquet", documents=True)
+    assert isinstance(batch_writer(output, "parquet"), ParquetWriter)
+
+
+def test_background_writer_saves_in_order():
+    saved = []
+    callbacks = []
+    with BackgroundWriter(SimpleNamespace(save=saved.append)) as writer:
+        writer.save([1, 2], on_saved=lambda: callbacks.append(1))
+        writer.save([], on_saved=lambda: callbacks.append(2))
+        writer.save([3], on_saved=lambda: callbacks.append(3))
+
+    assert saved == [[1, 2], [3]]
+    assert callbacks == [1, 2, 3]
+
+
+def test_background_writer_raises_save_errors_on_close():
+    def save(batch):
+        raise OSError("disk full")
+
+    writer = BackgroundWriter(SimpleNamespace(save=save))
+    writer.save([1])
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+
+
+def test_background_writer_raises_save_errors_on_save():
+    def save(batch):
+        raise OSError("disk full")
+
+    writer = BackgroundWriter(SimpleNamespace(save=save))
+    writer.save([1])
+
+    # The error reaches the producer on one of its next saves, once the writer thread has recorded it
+    with pytest.raises(OSError, match="disk full"):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            writer.save([])
+            time.sleep(0.01)
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+
+
+def test_checkpoint_merges_dict_fields():
+    state = InMemoryState()
+    state.set_state("spout", {"success_count": 3, "tokens": {"a": "1"}})
+    checkpoint = Checkpoint(state, "spout", interval=3600, pages=100)
+
+    checkpoint.update(tokens={"b": "2"})
+    checkpoint.update(tokens={"a": "3"}, page=7)
+    assert state.store["spout"] == {"success_count": 3, "tokens": {"a": "1"}}
+
+    checkpoint.flush()
+    assert state.store["spout"] == {"success_count": 3, "tokens": {"a": "3", "b": "2"}, "page": 7}
+
+
+def test_checkpoint_writes_every_pages_updates():
+    state = InMemoryState()
+    checkpoint = Checkpoint(state, "spout", interval=3600, pages=2)
+
+    checkpoint.update(page=1)
+    assert state.writes == 0
+    checkpoint.update(page=2)
+    assert state.writes == 1
+    assert state.store["spout"] == {"page": 2}
+
+
+def test_split_range_integers():
+    assert split_range(0, 10, 3) == [(0, 3), (3, 6), (6, 10)]
+
+
+def test_split_range_narrower_than_parts():
+    assert split_range(0, 2, 5) == [(0, 1), (1, 2)]
+    assert split_range(4, 4, 3) == [(4, 4)]
+
+
+def test_split_range_datetimes():
+    low = datetime.datetime(2023, 1, 1)
+    high = datetime.datetime(2023, 1, 3)
+    assert split_range(low, high, 2) == [(low, datetime.datetime(2023, 1, 2)), (datetime.datetime(2023, 1, 2), high)]
+
+
+def test_as_subquery_strips_the_trailing_semicolon():
+    assert as_subquery("SELECT * FROM t ;\n") == "(SELECT * FROM t) AS sub"
+
+
+def test_as_subquery_keeps_nested_order_by():
+    query = "SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS n FROM t WHERE name <> 'order by'"
+    assert as_subquery(query) == f"({query}) AS sub"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM t ORDER BY id",
+        "select * from t order  by id;",
+        "WITH recent AS (SELECT * FROM t) SELECT * FROM recent",
+    ],
+)
+def test_as_subquery_rejects_unwrappable_queries(query):
+    with pytest.raises(ValueError):
+        as_subquery(query)
+
+
+def test_map_threads_returns_results_in_order():
+    stop = threading.Event()
+    assert map_threads(lambda item: item * 2, [3, 1, 2], stop) == [6, 2, 4]
+    assert not stop.is_set()
+
+
+def test_map_threads_stops_the_other_workers_on_failure():
+    stop = threading.Event()
+
+    def work(item):
+        if item == 0:
+            raise OSError("scan failed")
+        # The other workers only return once they are told to stop
+        assert stop.wait(5)
+        return item
+
+    with pytest.raises(OSError, match="scan failed"):
+        map_threads(work, [0, 1, 2], stop)
+    assert stop.is_set()